@@ -0,0 +1,42 @@
+"""
+Per-call cost of resolving the caller with `inspect.stack()` (the previous
+implementation) against `ghostink.callsite.capture`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_callsite
+"""
+import inspect
+import timeit
+
+from ghostink import callsite
+
+STACK_DEPTH = 40
+NUMBER = 2000
+
+
+def _inspect_stack():
+    caller = inspect.stack()[1]
+    return caller.filename, caller.lineno, caller.function
+
+
+def _at_depth(depth, func):
+    """Call `func` with `depth` extra frames on the stack, like a deep request handler."""
+    if depth == 0:
+        return timeit.timeit(func, number=NUMBER) / NUMBER
+    return _at_depth(depth - 1, func)
+
+
+def main():
+    results = {
+        "inspect.stack()": _at_depth(STACK_DEPTH, _inspect_stack),
+        "callsite.capture()": _at_depth(STACK_DEPTH, callsite.capture),
+    }
+    baseline = results["inspect.stack()"]
+    print(f"caller resolution at {STACK_DEPTH} frames deep ({NUMBER} calls)")
+    for name, seconds in results.items():
+        print(f"  {name:<20} {seconds * 1e6:10.2f} us/call  {baseline / seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Cost of a drop whose shade is disabled by min_shade, next to an empty
+method call and an enabled, deduplicated drop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_disabled
+"""
+import timeit
+
+from ghostink import GhostInk
+
+NUMBER = 200000
+
+
+class _Empty:
+    def drop(self, etch_input=None, shade=None, echoes=None):
+        pass
+
+
+def main():
+    shade = GhostInk.shade
+    disabled = GhostInk(min_shade=shade.INFO)
+    enabled = GhostInk()
+    empty = _Empty()
+
+    results = {
+        "empty method call": timeit.timeit(
+            lambda: empty.drop("payload", shade.DEBUG), number=NUMBER
+        ),
+        "disabled drop": timeit.timeit(
+            lambda: disabled.drop("payload", shade.DEBUG), number=NUMBER
+        ),
+        "enabled drop (dedup hit)": timeit.timeit(
+            lambda: enabled.drop("payload", shade.INFO), number=NUMBER
+        ),
+    }
+    print(f"drop cost ({NUMBER} calls)")
+    for name, seconds in results.items():
+        print(f"  {name:<26} {seconds / NUMBER * 1e9:10.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Drop throughput with 1, 8 and 32 threads, for the default instance and a
+threadsafe one (per-thread buffers merged on read).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_threads
+"""
+import threading
+import time
+
+from ghostink import GhostInk
+
+DROPS = 200000
+THREADS = (1, 8, 32)
+
+
+def _run(ink, threads):
+    per_thread = DROPS // threads
+    start = threading.Barrier(threads + 1)
+
+    def work(n):
+        start.wait()
+        for i in range(per_thread):
+            ink.drop(f"worker {n}", GhostInk.shade.DEBUG)
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    began = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    len(ink.etches)  # merge buffered drops
+    return per_thread * threads / (time.perf_counter() - began)
+
+
+def main():
+    print(f"drop throughput ({DROPS} drops)")
+    for threads in THREADS:
+        for name, threadsafe in (("default", False), ("threadsafe", True)):
+            rate = _run(GhostInk(threadsafe=threadsafe), threads)
+            print(f"  {threads:>2} threads  {name:<11} {rate:12,.0f} drops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Benchmark suite for GhostInk's hot paths: drops per shade, deduplicated
+drops, haunt, whisper with and without masks or a cursor at growing store sizes,
+object formatting of large payloads and log file throughput.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                      # full run, up to 1M etches
+    python -m benchmarks.suite --quick              # small sizes, for a quick check
+    python -m benchmarks.suite --json results.json  # save machine-readable results
+    python -m benchmarks.suite --compare results.json --threshold 0.15
+
+With --compare, cases slower than the baseline by more than the threshold
+are listed as regressions and the exit status is 1.
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import platform
+import re
+import sys
+import tempfile
+import time
+import timeit
+
+from ghostink import GhostInk
+from ghostink.etch import Etch
+
+SIZES = (1000, 100000, 1000000)
+QUICK_SIZES = (1000, 10000)
+SHADES = ("TODO", "INFO", "DEBUG", "WARN", "ERROR")
+
+
+class Case:
+    """
+    A benchmark: `setup()` returns the function to time, which runs
+    `number` times per repeat; the best repeat is kept. `ops` is how many
+    operations one call of the function does. Setup only runs for the
+    cases selected with --filter.
+    """
+
+    def __init__(self, name, setup, number=1, repeat=5, ops=1):
+        self.name = name
+        self.setup = setup
+        self.number = number
+        self.repeat = repeat
+        self.ops = ops
+
+    def run(self) -> dict:
+        func = self.setup()
+        func()  # warm up caches before timing
+        timer = timeit.Timer(func)
+        best = min(timer.repeat(repeat=self.repeat, number=self.number))
+        return {
+            "ns_per_op": best / (self.number * self.ops) * 1e9,
+            "number": self.number,
+            "repeat": self.repeat,
+            "ops": self.ops,
+        }
+
+
+def _filled(size: int, **kwargs) -> GhostInk:
+    """A GhostInk holding `size` etches over 50 files, 3 echoes and every shade."""
+    ink = GhostInk(color=False, **kwargs)
+    shades = [ink.shade[name] for name in SHADES]
+    echoes = (("#db",), ("#cache",), ())
+    etches = ink.etches
+    for i in range(size):
+        etches.add(
+            Etch(
+                shades[i % len(shades)],
+                f"etch {i}",
+                f"pkg/module_{i % 50}.py",
+                i % 1000,
+                "handler",
+                echoes[i % len(echoes)],
+            )
+        )
+    return ink
+
+
+# consecutive whisper cases share a store, the previous size is released
+_filled_store = functools.lru_cache(maxsize=1)(_filled)
+
+
+def _whisper(size: int, **masks):
+    def setup():
+        ink = _filled_store(size)
+
+        def run():
+            ink.whisper(stream=io.StringIO(), **masks)
+
+        return run
+
+    return setup
+
+
+def drop_cases():
+    def new_etches(name):
+        def setup():
+            ink = GhostInk(max_etches=10000)
+            shade = ink.shade[name]
+            counter = iter(range(10 ** 12))
+            return lambda: ink.drop(f"etch {next(counter)}", shade=shade)
+
+        return setup
+
+    for name in SHADES:
+        yield Case(f"inkdrop[{name}]", new_etches(name), number=2000)
+
+    def dedup_hit():
+        ink = GhostInk()
+        return lambda: ink.drop("same etch", shade=ink.shade.INFO)
+
+    yield Case("inkdrop dedup hit", dedup_hit, number=20000)
+
+    def disabled():
+        ink = GhostInk(min_shade=GhostInk.shade.ERROR)
+        return lambda: ink.drop("off", shade=ink.shade.DEBUG)
+
+    yield Case("inkdrop disabled shade", disabled, number=100000)
+
+
+def haunt_cases():
+    def setup():
+        ink = GhostInk()
+
+        def haunt():
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(100):
+                    ink.haunt("checkpoint")
+
+        return haunt
+
+    yield Case("haunt", setup, number=10, ops=100)
+
+
+def whisper_cases(sizes):
+    for size in sizes:
+        repeat = 5 if size < 100000 else 1
+        yield Case(f"whisper[{size}]", _whisper(size), repeat=repeat)
+        yield Case(
+            f"whisper[{size}] shade_mask",
+            _whisper(size, shade_mask=GhostInk.shade.WARN),
+            repeat=repeat,
+        )
+        yield Case(
+            f"whisper[{size}] file_mask",
+            _whisper(size, file_mask="pkg/module_7.py"),
+            repeat=repeat,
+        )
+        yield Case(
+            f"whisper[{size}] echo_mask",
+            _whisper(size, echo_mask=["cache"]),
+            repeat=repeat,
+        )
+        yield Case(
+            f"whisper[{size}] since last 100",
+            _whisper(size, since=size - 100),
+            repeat=repeat,
+        )
+
+
+def format_cases():
+    payloads = {
+        "dict 100k": lambda: {f"key {i}": i for i in range(100000)},
+        "list 1M": lambda: list(range(1000000)),
+        "nested": lambda: {"rows": [{"id": i, "tags": ["a", "b"]} for i in range(10000)]},
+        "text 1MB": lambda: "x" * 1000000,
+    }
+
+    def formatting(build):
+        def setup():
+            ink = GhostInk()
+            payload = build()
+            return lambda: ink._format_etch_from_object(payload)
+
+        return setup
+
+    for name, build in payloads.items():
+        yield Case(f"format_object[{name}]", formatting(build), number=20)
+
+
+def log_cases(sizes, directory):
+    size = sizes[0] * 10
+
+    def logging_whisper(mode, **kwargs):
+        def setup():
+            ink = _filled(
+                size,
+                project_root=directory,
+                log_to_file=True,
+                log_file=f"bench_{mode}.log",
+                **kwargs,
+            )
+
+            def log():
+                ink.whisper(stream=io.StringIO())
+                ink.flush_logs()
+
+            return log
+
+        return setup
+
+    yield Case("log_to_file[sync] per etch", logging_whisper("sync"), repeat=3, ops=size)
+    yield Case(
+        "log_to_file[async] per etch",
+        logging_whisper("async", log_async=True),
+        repeat=3,
+        ops=size,
+    )
+
+
+def cases(sizes, directory):
+    yield from drop_cases()
+    yield from haunt_cases()
+    yield from whisper_cases(sizes)
+    yield from format_cases()
+    yield from log_cases(sizes, directory)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Print each case against the baseline and return the names slower by
+    more than `threshold` (0.1 is 10%).
+    """
+    regressions = []
+    print(f"\ncompared to baseline (threshold {threshold:.0%})")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<36} new")
+            continue
+        change = result["ns_per_op"] / before["ns_per_op"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<36} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="small store sizes only")
+    parser.add_argument("--filter", help="only run cases matching this regex")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown reported as a regression (default: 0.1, 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    pattern = re.compile(args.filter) if args.filter else None
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for case in cases(sizes, directory):
+            if pattern is not None and not pattern.search(case.name):
+                continue
+            result = results[case.name] = case.run()
+            print(f"  {case.name:<36} {result['ns_per_op']:14,.1f} ns/op", flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump(
+                {
+                    "created": time.time(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "quick": args.quick,
+                    "results": results,
+                },
+                out,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            regressions = compare(results, json.load(baseline)["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,6 @@
 # ghostink/__init__.py
 from .core import GhostInk
 from .builtins import ghostall, unghostall
+from .sinks import Sink, StreamSink, FileSink, JsonlSink, QueuedSink
+from .sampling import Sampler, EveryN, Probability, TokenBucket
+from .formatting import ObjectFormatter
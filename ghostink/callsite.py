@@ -0,0 +1,157 @@
+import os
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+
+# Frames whose code lives in these directories belong to GhostInk itself
+# (core, shades, helpers) and are never reported as the call site.
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_INTERNAL_DIRS = frozenset((_PACKAGE_DIR, os.path.join(_PACKAGE_DIR, "shades")))
+
+_UNKNOWN = ("<unknown>", 0, "<unknown>")
+
+# co_filename -> bool, so the directory test runs once per source file
+_internal_files = {}
+
+
+def is_internal(filename: str) -> bool:
+    """
+    Return True if `filename` is one of GhostInk's own source files.
+    """
+    try:
+        return _internal_files[filename]
+    except KeyError:
+        internal = os.path.dirname(os.path.abspath(filename)) in _INTERNAL_DIRS
+        _internal_files[filename] = internal
+        return internal
+
+
+def caller_frame(depth: int = 0):
+    """
+    Return the first frame outside of GhostInk, walking `f_back` links.
+
+    Parameters:
+    - depth (int): Extra frames to skip above the first external frame,
+      for wrappers and BaseEtch subclasses defined outside the package (default: 0).
+
+    Returns:
+    - frame or None: The caller's frame, or None if the stack is exhausted.
+    """
+    frame = sys._getframe(1)
+    while frame is not None and is_internal(frame.f_code.co_filename):
+        frame = frame.f_back
+    while depth > 0 and frame is not None and frame.f_back is not None:
+        frame = frame.f_back
+        depth -= 1
+    return frame
+
+
+def capture(depth: int = 0) -> tuple:
+    """
+    Return the (filename, line number, function name) of the caller.
+
+    Only the frame object is touched: no FrameInfo objects are built and no
+    source lines are read, unlike `inspect.stack()`.
+
+    Parameters:
+    - depth (int): Extra frames to skip, see `caller_frame` (default: 0).
+
+    Returns:
+    - tuple: (filename, lineno, function name).
+    """
+    frame = caller_frame(depth)
+    if frame is None:
+        return _UNKNOWN
+    code = frame.f_code
+    return code.co_filename, frame.f_lineno, code.co_name
+
+
+@lru_cache(maxsize=4096)
+def split_path(path: str) -> tuple:
+    """
+    Return the (directory, filename) split of `path`, memoized.
+    """
+    directory, filename = os.path.split(path)
+    return sys.intern(directory), sys.intern(filename)
+
+
+class CallSite:
+    """
+    A resolved call site: relative path, its directory/filename split,
+    line number and function name, all computed once.
+    """
+
+    __slots__ = ("path", "directory", "filename", "line", "func")
+
+    def __init__(self, path: str, line: int, func: str):
+        self.path = sys.intern(path)
+        self.directory, self.filename = split_path(self.path)
+        self.line = line
+        self.func = func
+
+    def __repr__(self):
+        return f"CallSite({self.path!r}, {self.line}, {self.func!r})"
+
+
+class CallSiteCache:
+    """
+    LRU cache of CallSite objects keyed on (code object, line number).
+
+    Relative paths depend on `project_root`, so assigning a new root clears
+    the cache.
+    """
+
+    def __init__(self, project_root: str = ".", maxsize: int = 1024):
+        self._project_root = project_root
+        self.maxsize = maxsize
+        self._sites = OrderedDict()
+
+    @property
+    def project_root(self) -> str:
+        return self._project_root
+
+    @project_root.setter
+    def project_root(self, project_root: str) -> None:
+        if project_root != self._project_root:
+            self._project_root = project_root
+            self.clear()
+
+    def clear(self) -> None:
+        self._sites.clear()
+
+    def __len__(self):
+        return len(self._sites)
+
+    def resolve(self, frame) -> CallSite:
+        """
+        Return the CallSite for `frame`, building it on the first hit.
+
+        Parameters:
+        - frame (frame or None): The caller's frame, see `caller_frame`.
+
+        Returns:
+        - CallSite: The cached call site.
+        """
+        if frame is None:
+            return CallSite(*_UNKNOWN)
+        return self.resolve_code(frame.f_code, frame.f_lineno)
+
+    def resolve_code(self, code, line_no: int) -> CallSite:
+        """
+        Return the CallSite for line `line_no` of `code`, building it on the first hit.
+        """
+        key = (code, line_no)
+        sites = self._sites
+        try:
+            site = sites[key]
+        except KeyError:
+            relative_path = os.path.relpath(code.co_filename, start=self._project_root)
+            site = sites[key] = CallSite(relative_path, line_no, code.co_name)
+            if len(sites) > self.maxsize:
+                sites.popitem(last=False)
+        else:
+            try:
+                sites.move_to_end(key)
+            except KeyError:
+                pass  # evicted by another thread in the meantime
+        return site
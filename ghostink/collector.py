@@ -0,0 +1,130 @@
+import atexit
+import os
+import socket
+import threading
+from multiprocessing import AuthenticationError, util
+from multiprocessing.connection import Client, Listener
+
+
+def _default_family() -> str:
+    return "AF_UNIX" if hasattr(socket, "AF_UNIX") else "AF_INET"
+
+
+class Collector:
+    """
+    Receives etches pushed by worker processes and merges them into a
+    GhostInk, so `whisper` in the parent shows what every worker dropped.
+
+    Workers connect with `GhostInk.connect_collector(address, authkey)`;
+    children forked from the collecting process are connected automatically.
+    """
+
+    def __init__(self, ghost_ink, address=None, authkey: bytes = None):
+        """
+        Parameters:
+        - ghost_ink (GhostInk): The instance receiving the etches.
+        - address (str or tuple): Listener address (default: None, a fresh local
+          socket path, or an ephemeral localhost port where AF_UNIX is missing).
+        - authkey (bytes): Shared secret for worker connections (default: None, random).
+        """
+        self.ghost_ink = ghost_ink
+        self.authkey = os.urandom(16) if authkey is None else authkey
+        family = None if address is not None else _default_family()
+        if address is None and family == "AF_INET":
+            address = ("127.0.0.1", 0)
+        self._listener = Listener(address, family=family, authkey=self.authkey)
+        self.address = self._listener.address
+        self.received = 0
+        self._thread = threading.Thread(
+            target=self._serve, name="ghostink-collector", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                return  # listener closed
+            except Exception:
+                continue  # failed handshake, keep serving
+            with conn:
+                try:
+                    records = conn.recv()
+                except (OSError, EOFError):
+                    continue
+                self.ghost_ink._merge_records(records)
+                self.received += len(records)
+                conn.send(len(records))
+
+    def close(self) -> None:
+        """Stop accepting workers."""
+        self._listener.close()
+        atexit.unregister(self.close)
+
+
+class CollectorClient:
+    """
+    Pushes a worker's etches to a Collector: periodically from a background
+    thread, on `push()`, and when the worker exits. Pushed etches leave the
+    worker's store, so every occurrence is counted exactly once.
+    """
+
+    def __init__(self, ghost_ink, address, authkey: bytes, interval: float = 1.0):
+        self.ghost_ink = ghost_ink
+        self.address = address
+        self.authkey = authkey
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="ghostink-collector-client", daemon=True
+        )
+        self._thread.start()
+        self._register_finalizer()
+        # multiprocessing clears finalizers in new children after the fork
+        # hooks ran; its after-fork callbacks run later and re-register
+        util.register_after_fork(self, CollectorClient._register_finalizer)
+        atexit.register(self.close)
+
+    def _register_finalizer(self) -> None:
+        # multiprocessing children skip atexit, their finalizers still run
+        util.Finalize(self, self.close, exitpriority=10)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.push()
+            except (OSError, EOFError, AuthenticationError):
+                pass  # collector unreachable, the etches stay for the next try
+
+    def push(self) -> int:
+        """
+        Send the etches dropped since the last push. If the collector cannot
+        be reached, the etches stay in the worker's store and the error is
+        raised.
+
+        Returns:
+        - int: The number of etches sent.
+        """
+        if not self.ghost_ink.etches:
+            return 0
+        with Client(self.address, authkey=self.authkey) as conn:
+            etches = self.ghost_ink._take_etches()
+            try:
+                conn.send([etch.to_dict() for etch in etches])
+                return conn.recv()
+            except BaseException:
+                self.ghost_ink._restore_etches(etches)
+                raise
+
+    def close(self) -> None:
+        """Push what is left and stop the background thread."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        try:
+            self.push()
+        except (OSError, EOFError, AuthenticationError):
+            pass  # the collector is gone, the etches stay in the worker
+        atexit.unregister(self.close)
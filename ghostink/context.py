@@ -0,0 +1,54 @@
+import sys
+from contextvars import ContextVar
+
+# formatted echoes added to every drop in the current context, see GhostInk.echo_scope
+_scoped_echoes = ContextVar("ghostink_echoes", default=())
+
+
+def scoped_echoes() -> tuple:
+    """Return the formatted echoes of the enclosing echo scopes."""
+    return _scoped_echoes.get()
+
+
+class EchoScope:
+    """
+    Adds echoes to every drop made inside it. The echoes live in a
+    ContextVar, so each asyncio task (and each thread) sees only the scopes
+    it entered itself, while tasks created inside a scope inherit it.
+    """
+
+    __slots__ = ("echoes", "_tokens")
+
+    def __init__(self, echoes: tuple):
+        self.echoes = echoes
+        self._tokens = []
+
+    def __enter__(self):
+        current = _scoped_echoes.get()
+        added = tuple(echo for echo in self.echoes if echo not in current)
+        self._tokens.append(_scoped_echoes.set(current + added))
+        return self
+
+    def __exit__(self, *exc_info):
+        _scoped_echoes.reset(self._tokens.pop())
+
+
+def task_name():
+    """Return the name of the running asyncio task, or None outside of one."""
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is None:
+        return None  # no loop can run before asyncio is imported
+    # _get_running_loop returns None instead of raising, which keeps the
+    # check cheap for drops made outside of an event loop
+    loop = asyncio._get_running_loop()
+    if loop is None:
+        return None
+    task = asyncio.current_task(loop)
+    if task is None:
+        return None
+    return task.get_name()
+
+
+def task_echo(name: str) -> str:
+    """Return the formatted echo tagging etches with the task called `name`."""
+    return "#task:" + name.strip().replace(" ", "_")
@@ -1,17 +1,53 @@
 import os
-import random
-import traceback
-import json
-import inspect
-import logging
-from datetime import datetime
+import sys
+import threading
+import weakref
+from collections import OrderedDict, deque
+from functools import partial
 from typing import List, Optional, Union
 from enum import Enum
-from colorama import Fore, Back, Style, init
+from colorama import Fore, Style
 from .shades import Todo, Info, Debug, Warn, Error
+from .shades.base import BaseEtch
+from . import callsite
+from .theme import Theme, PLAIN, prepare_console
+from .store import EtchStore
+from .sinks import Sink, QueuedSink
+from .sampling import Sampler, SiteSampling
+from .etch import Etch
+from .formatting import DeferredText, ObjectFormatter
+from .spans import LatencyHistogram, Span, format_ns
+from .stats import OverheadStats, write_prometheus
+from .context import EchoScope, scoped_echoes, task_echo, task_name
 
-# Initialize colorama
-init(autoreset=True)
+# Modules needed only by some features (asyncio, logging, the collector,
+# the scanner, exports) are imported where they are used, so importing
+# ghostink stays cheap for short-lived processes.
+
+# logger name -> AsyncFileWriter, shared like the loggers themselves
+_log_writers = {}
+
+# live instances, reset in forked children
+_instances = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for ghost_ink in list(_instances):
+        ghost_ink._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+# dropped values formatted even with defer_objects: cheap to format, and
+# equal values must count as one etch
+_FORMATTED_AT_DROP = (int, float, complex, bool, type(None), bytes, tuple)
+
+# sampling snapshots kept for `whisper(since=...)`, one per recent cursor
+_SAMPLING_SNAPSHOTS = 16
+
+# shade name -> severity, used by the min_shade threshold
+_SEVERITIES = {"DEBUG": 10, "TODO": 15, "INFO": 20, "WARN": 30, "ERROR": 40}
 
 
 class GhostInk:
@@ -26,6 +62,9 @@ class GhostInk:
         - DEBUG: Represents debug information.
         - INFO: Represents informational messages.
         - ERROR: Represents warning messages.
+
+        Each shade has an `ordinal` (its position, used for bit masks and flat
+        lookups) and a `severity` (DEBUG < TODO < INFO < WARN < ERROR).
         """
 
         TODO = "TODO"
@@ -35,6 +74,10 @@ class GhostInk:
         ERROR = "ERROR"
         _ECHO = "ECHO"  # only for internal use
 
+        def __init__(self, value):
+            self.ordinal = len(type(self).__members__)
+            self.severity = _SEVERITIES.get(value, 0)
+
     def get_shades(self):
         return self.shade
 
@@ -44,6 +87,28 @@ class GhostInk:
         project_root: str = ".",
         log_to_file: bool = False,
         log_file: str = "ghostink.log",
+        stack_offset: int = 0,
+        lazy_traces: bool = False,
+        max_etches: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        shade_quotas: Optional[dict] = None,
+        ttl: Optional[float] = None,
+        log_async: bool = False,
+        log_flush_interval: float = 1.0,
+        log_queue_size: int = 10000,
+        log_overflow: str = "drop",
+        sink: Optional[Sink] = None,
+        color: Union[bool, str] = "auto",
+        min_shade: Optional["GhostInk.shade"] = None,
+        shades: Optional[List["GhostInk.shade"]] = None,
+        sampler: Optional[Sampler] = None,
+        threadsafe: bool = False,
+        buffer_size: int = 256,
+        collector: Optional[tuple] = None,
+        task_echoes: bool = False,
+        formatter: Optional[ObjectFormatter] = None,
+        defer_objects: bool = False,
+        stats_sample: int = 64,
     ):
         """
         Initializes a GhostInk instance with optional logging to a file.
@@ -53,15 +118,95 @@ class GhostInk:
         - project_root (str): The root directory of the project (default: ".").
         - log_to_file (bool): Whether to log messages to a file (default: False).
         - log_file (str): The name of the log file (default: "ghostink.log").
+        - stack_offset (int): Extra frames to skip when resolving the caller,
+          for code that wraps GhostInk in its own helpers (default: 0).
+        - lazy_traces (bool): Keep ERROR/DEBUG/WARN stack traces as code objects and
+          line numbers, formatting them only when displayed or logged (default: False).
+        - max_etches (int): Maximum number of etches kept, oldest evicted first (default: None).
+        - max_bytes (int): Maximum approximate memory held by etches (default: None).
+        - shade_quotas (dict): Per-shade ring buffer sizes, e.g. {GhostInk.shade.DEBUG: 500} (default: None).
+        - ttl (float): Seconds after which an etch expires (default: None).
+        - log_async (bool): Write the log file from a background thread in batches (default: False).
+        - log_flush_interval (float): Seconds between batch writes when log_async is on (default: 1.0).
+        - log_queue_size (int): Records buffered before log_overflow applies (default: 10000).
+        - log_overflow (str): "drop" or "block" when the log queue is full (default: "drop").
+        - sink (Sink): Streams every new etch as it is dropped, e.g. JsonlSink("etches.jsonl").
+          Combine with max_etches to keep memory flat (default: None).
+        - color (bool or str): Color whisper output; "auto" colors only terminals (default: "auto").
+        - min_shade (GhostInk.shade or str): Ignore drops below this severity. Falls back to the
+          GHOSTINK_MIN_SHADE environment variable, e.g. "WARN" (default: None).
+        - shades (List[GhostInk.shade or str]): Only accept drops of these shades. Falls back to
+          GHOSTINK_SHADES, e.g. "ERROR,WARN" (default: None, all shades).
+        - sampler (Sampler): Per-call-site sampling for every drop: EveryN, Probability
+          or TokenBucket. Suppressed counts are listed by whisper (default: None).
+        - threadsafe (bool): Give each thread its own drop buffer, merged into the
+          store on read or when it holds `buffer_size` etches. Drops are thread safe
+          without it; under the GIL the buffers do not raise throughput (see
+          benchmarks/bench_threads.py). Drops written to a sink are not buffered
+          (default: False).
+        - buffer_size (int): Etches a thread buffers before merging (default: 256).
+        - collector (tuple): (address, authkey) of a parent's collector, see
+          `start_collector`; etches are pushed there instead of kept (default: None).
+        - task_echoes (bool): Tag drops made inside an asyncio task with a
+          "#task:<name>" echo. Echoes are part of an etch's identity, so each task
+          then gets its own etch instead of raising one count (default: False).
+        - formatter (ObjectFormatter): Depth, item and length limits for dropped
+          dicts, lists and objects (default: None, ObjectFormatter()).
+        - defer_objects (bool): Keep dropped dicts, lists and objects and format them
+          on first display instead of at drop time. Deferred objects are deduplicated
+          by identity; scalars and tuples are always formatted at once, and nothing is
+          deferred under max_bytes, which needs the formatted size (default: False).
+        - stats_sample (int): Time one call in this many of each step reported by
+          `stats`; 1 times every call, 0 only counts (default: 64).
 
         Sets up a logger if logging to a file is enabled.
         """
         self.title = title
-        self.etches = set()
+        self._lock = threading.RLock()
+        self._local = threading.local() if threadsafe else None
+        self._buffers = []  # (thread, deque) per thread that dropped, threadsafe only
+        self.buffer_size = buffer_size
+        self._collector = None
+        self._collector_client = None
+        self._store = EtchStore(
+            max_etches=max_etches,
+            max_bytes=max_bytes,
+            shade_quotas=shade_quotas,
+            ttl=ttl,
+        )
+        self.lazy_traces = lazy_traces
+        self._callsites = callsite.CallSiteCache(project_root)
         self.project_root = project_root
         self.log_to_file = log_to_file
         self.log_file = log_file
         self.logger = None
+        self.log_async = log_async
+        self.log_flush_interval = log_flush_interval
+        self.log_queue_size = log_queue_size
+        self.log_overflow = log_overflow
+        self._log_writer = None
+        self.sink = sink
+        self._nonblocking_sinks = {}  # id(sink) -> (sink, QueuedSink), see adrop
+        self.task_echoes = task_echoes
+        self.formatter = formatter or ObjectFormatter()
+        self._stats = OverheadStats(stats_sample)
+        # one bound method shared by every deferred object
+        self._format_object = self._format_etch_from_object
+        self.defer_objects = defer_objects
+        self.color = color
+        self.theme = Theme()
+        self.sampler = sampler
+        self._sampling = SiteSampling()
+        self._spans = {}  # (code object, line number) -> (name, LatencyHistogram)
+        self._scanned = {}  # absolute source path -> etches its comment markers produced
+        self._whisper_at = (0, None)  # cursor and sampling snapshot, see whisper_new
+        # cursor -> sampling counts when whisper returned it, the last few only
+        self._sampling_at = OrderedDict()
+        self._report_lock = threading.Lock()
+        self.registry = ShadeRegistry(self)
+        self._handlers = self.registry.handlers
+        self.set_shade_filter(min_shade, shades)
+        self.stack_offset = stack_offset
 
         # alias the inkdrop/haunt method with just drop/ln
         self.drop = self.inkdrop
@@ -70,6 +215,240 @@ class GhostInk:
         if log_to_file:
             self._setup_logger(log_file)
 
+        if collector is not None:
+            self.connect_collector(*collector)
+        _instances.add(self)
+
+    @property
+    def etches(self) -> EtchStore:
+        """The etch store, with every thread's pending drops merged in."""
+        if self._buffers:
+            self._merge_buffers()
+        return self._store
+
+    def _record(self, etch, sink=None) -> None:
+        """
+        Store a new drop: straight into the store, or into the calling
+        thread's buffer when threadsafe. Drops headed for a sink skip the
+        buffer, so they are written as they are dropped. Called by the shade
+        handlers.
+        """
+        local = self._local
+        if local is None or sink is not None or self.sink is not None:
+            with self._lock:
+                self._add(etch, sink)
+            return
+        try:
+            buffer = local.buffer
+        except AttributeError:
+            buffer = local.buffer = deque()
+            with self._lock:
+                self._buffers.append((threading.current_thread(), buffer))
+        buffer.append((etch, sink))
+        if len(buffer) >= self.buffer_size:
+            self._merge_buffers()
+
+    def _add(self, etch, sink=None) -> None:
+        # caller holds self._lock
+        if self._store.add(etch):
+            self._stats.new[etch.shade.ordinal] += 1
+            sink = sink or self.sink
+            if sink is not None:
+                if self._nonblocking_sinks:
+                    # a sink adrop queued is only written from its queue thread
+                    queued = self._nonblocking_sinks.get(id(sink))
+                    if queued is not None:
+                        sink = queued[1]
+                sink.write(etch)
+        else:
+            self._stats.hits[etch.shade.ordinal] += 1
+
+    def _merge_buffers(self) -> None:
+        """Drain every thread's buffer into the store, dropping dead threads' buffers."""
+        with self._lock:
+            live = []
+            for thread, buffer in self._buffers:
+                while buffer:
+                    self._add(*buffer.popleft())
+                if thread.is_alive():
+                    live.append((thread, buffer))
+            self._buffers = live
+
+    def start_collector(self, address=None, authkey: Optional[bytes] = None) -> tuple:
+        """
+        Starts collecting etches from worker processes into this instance.
+
+        Children forked afterwards push their etches here automatically; other
+        workers pass the returned value as GhostInk(collector=...).
+
+        Parameters:
+        - address (str or tuple): Listener address (default: None, a fresh local socket).
+        - authkey (bytes): Shared secret (default: None, random).
+
+        Returns:
+        - tuple: (address, authkey) for the workers.
+        """
+        if self._collector is None:
+            from .collector import Collector
+
+            self._collector = Collector(self, address, authkey)
+        return self._collector.address, self._collector.authkey
+
+    def connect_collector(self, address, authkey: bytes, interval: float = 1.0) -> None:
+        """
+        Pushes this instance's etches to a collector every `interval` seconds
+        and at exit. Pushed etches leave the local store.
+        """
+        from .collector import CollectorClient
+
+        self._collector_client = CollectorClient(self, address, authkey, interval)
+
+    def push(self) -> int:
+        """
+        Sends the pending etches to the collector now.
+
+        Returns:
+        - int: The number of etches sent.
+        """
+        if self._collector_client is None:
+            return 0
+        return self._collector_client.push()
+
+    def _take_etches(self) -> list:
+        """Remove every etch from the store and return them."""
+        with self._lock:
+            etches = self.etches
+            taken = list(etches)
+            etches.clear()
+        return taken
+
+    def _restore_etches(self, taken: list) -> None:
+        """
+        Put back etches `_take_etches` removed but could not deliver, merged
+        with equal etches dropped in the meantime. Stats and sinks already
+        counted them.
+        """
+        with self._lock:
+            etches = self.etches
+            for etch in taken:
+                etches.add(etch)
+
+    def _merge_records(self, records: list) -> None:
+        """Merge serialized etches received from a worker."""
+        with self._lock:
+            for data in records:
+                self._add(Etch.from_dict(data, self.registry))
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Reset locks and buffers copied from the parent. If the parent was
+        collecting, drop its etches and push this child's etches to it.
+        """
+        self._lock = threading.RLock()
+        self._report_lock = threading.Lock()
+        if self._local is not None:
+            self._local = threading.local()
+        self._buffers = []
+        collector, self._collector = self._collector, None
+        self._collector_client = None
+        if collector is not None:
+            self._store.clear()
+            self.connect_collector(collector.address, collector.authkey)
+
+    def set_shade_filter(
+        self,
+        min_shade: Optional["GhostInk.shade"] = None,
+        shades: Optional[List["GhostInk.shade"]] = None,
+    ) -> None:
+        """
+        Enables only the shades at or above `min_shade` and listed in `shades`,
+        given as shades or shade names such as "WARN". Missing arguments fall back to the GHOSTINK_MIN_SHADE and GHOSTINK_SHADES
+        environment variables, then to every shade.
+
+        The result is a bit mask indexed by shade ordinal, so a disabled drop
+        costs one shift-and-test in `inkdrop`.
+        """
+        if min_shade is not None:
+            min_shade = self._named_shade("min_shade", min_shade)
+        elif os.environ.get("GHOSTINK_MIN_SHADE"):
+            min_shade = self._named_shade("GHOSTINK_MIN_SHADE", os.environ["GHOSTINK_MIN_SHADE"])
+        if shades is not None:
+            shades = [self._named_shade("shades", shade) for shade in shades]
+        elif os.environ.get("GHOSTINK_SHADES"):
+            shades = [
+                self._named_shade("GHOSTINK_SHADES", name)
+                for name in os.environ["GHOSTINK_SHADES"].split(",")
+                if name.strip()
+            ]
+        self._shade_filter = (min_shade, shades)
+
+        # _ECHO always passes the mask so that its handler rejects it loudly
+        mask = 1 << self.shade._ECHO.ordinal
+        for shade in self.registry:
+            if shade == self.shade._ECHO:
+                continue
+            if min_shade is not None and shade.severity < min_shade.severity:
+                continue
+            if shades is not None and shade not in shades:
+                continue
+            mask |= 1 << shade.ordinal
+        self._shade_mask = mask
+
+    def _named_shade(self, source: str, shade):
+        """
+        Returns `shade`, resolving a shade name such as "WARN" given by the
+        argument or environment variable `source`.
+        """
+        if not isinstance(shade, str):
+            return shade
+        found = self.registry._by_name.get(shade.strip().upper())
+        if found is None or found == self.shade._ECHO:
+            names = [known.name for known in self.registry if known != self.shade._ECHO]
+            raise ValueError(f"unvalid {source} '{shade}', use one of {names}")
+        return found
+
+    def register_shade(
+        self,
+        name: str,
+        handler_cls: Optional[type] = None,
+        color: Optional[str] = None,
+        severity: int = 20,
+    ):
+        """
+        Registers a custom shade, e.g. PERF, with its own handler.
+
+        Parameters:
+        - name (str): The shade name.
+        - handler_cls (type): A BaseEtch subclass; its capture_trace, format_input and
+          inker define how the shade captures and formats etches (default: None, BaseEtch).
+        - color (str): A colorama color prefix for whisper output (default: None).
+        - severity (int): Position against min_shade, INFO is 20 (default: 20).
+
+        Returns:
+        - CustomShade: The new shade, to pass as `shade` to inkdrop.
+        """
+        shade = self.registry.register(name, handler_cls, severity)
+        if color is not None:
+            self.theme.set_shade_color(name, color)
+        # explicit filters stay as they were; the new shade is checked against them
+        self.set_shade_filter(*self._shade_filter)
+        return shade
+
+    def is_enabled(self, shade: "GhostInk.shade") -> bool:
+        """Returns True if drops of `shade` are currently recorded."""
+        if shade == self.shade._ECHO:
+            return False
+        return bool(self._shade_mask >> shade.ordinal & 1)
+
+    @property
+    def project_root(self) -> str:
+        return self._callsites.project_root
+
+    @project_root.setter
+    def project_root(self, project_root: str) -> None:
+        # relative paths are cached per call site, so a new root invalidates them
+        self._callsites.project_root = project_root
+
     def haunt(self, curse: str = None) -> None:
         """
         Prints the file name, line number, function name, and timestamp of where this method is called.
@@ -78,15 +457,24 @@ class GhostInk:
         - curse (str): Optional message to print before the file information.
 
         Prints the file information along with the message if provided, including the file name, line number, function name, and timestamp.
+        Inside an asyncio task, the task name follows the function name.
         """
         # Get the calling frame information
-        caller_frame = inspect.stack()[1]
-        caller_file = os.path.basename(caller_frame.filename)  # File name
-        caller_line = caller_frame.lineno  # Line number
-        caller_func = caller_frame.function  # Function name
+        caller_path, caller_line, caller_func = callsite.capture(self.stack_offset)
+        caller_file = os.path.basename(caller_path)  # File name
+        prepare_console()
 
         # Get the current timestamp
-        timestamp = datetime.now().strftime("%H:%M:%S")  # Time down to milliseconds
+        from datetime import datetime
+
+        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]  # Time down to milliseconds
+
+        # Name the task, coroutine frames alone don't tell requests apart
+        task = task_name()
+        if task is not None:
+            caller_func = f"{caller_func}() [task {task}]"
+        else:
+            caller_func = f"{caller_func}()"
 
         if curse:
             print(curse)
@@ -95,7 +483,7 @@ class GhostInk:
                     caller_file}{Style.RESET_ALL}:"""
                 f"""{Style.BRIGHT}{Fore.MAGENTA}{
                     caller_line}{Style.RESET_ALL} in """
-                f"""{Style.BRIGHT}{Fore.RED}{caller_func}(){Style.RESET_ALL} at {
+                f"""{Style.BRIGHT}{Fore.RED}{caller_func}{Style.RESET_ALL} at {
                     timestamp}"""
             )
         else:
@@ -103,7 +491,7 @@ class GhostInk:
                 f"""{Style.BRIGHT}{Fore.YELLOW}{caller_file}{Style.RESET_ALL}:"""
                 f"""{Style.BRIGHT}{Fore.MAGENTA}{
                     caller_line}{Style.RESET_ALL} in """
-                f"""{Style.BRIGHT}{Fore.RED}{caller_func}(){Style.RESET_ALL} at {
+                f"""{Style.BRIGHT}{Fore.RED}{caller_func}{Style.RESET_ALL} at {
                     timestamp}"""
             )
 
@@ -113,149 +501,555 @@ class GhostInk:
         shade: Optional["GhostInk.shade"] = None,
         echoes: Optional[List[str]] = None,
         filename: Optional[str] = None,
+        sink: Optional[Sink] = None,
+        sample: Optional[Sampler] = None,
+        value: Optional[float] = None,
     ) -> None:
+        """
+        Adds an etch for the calling line.
+
+        Parameters:
+        - etch_input (str or dict or object): The text or object to record.
+        - shade (GhostInk.shade): The shade of the etch (default: GhostInk.shade.TODO).
+        - echoes (List[str]): Tags for filtering the etch (default: None).
+        - filename (str): Harvest the comment markers of this source file instead,
+          see `scan`; the other arguments are ignored.
+        - sink (Sink): Stream this etch to `sink` instead of the instance sink (default: None).
+        - sample (Sampler): Sample drops from this line with `sample` instead of the
+          instance sampler, e.g. EveryN(100) (default: None).
+        - value (float): A number to aggregate (count/min/max/avg) across the
+          occurrences of this etch, e.g. a latency (default: None).
+        """
         if filename:
-            # ? treating the file should be in this lvl
-            # ? in case there are multiple shades
-            pass
+            self.scan(filename)
         else:
             if shade is None:
                 shade = self.shade.TODO
-            shade_cls = ShadeRegistry.get_shade_class(shade)
-            shade_instace = shade_cls(ghost_ink=self)
-            shade_instace.inker(etch_input, shade, echoes)
+            if not self._enabled(shade):
+                # disabled shade: no frame inspection, allocation or formatting
+                return
+            sampler = sample or self.sampler
+            if sampler is not None and not self._sampling.allow(
+                sampler, callsite.caller_frame(self.stack_offset)
+            ):
+                # sampled out before any path, stack or payload work
+                return
+            self._handlers[shade.ordinal].inker(
+                etch_input, shade, echoes, sink=sink, value=value
+            )
+
+    def _enabled(self, shade) -> int:
+        """
+        Returns the mask bit of `shade`; raises ValueError for non-shades and
+        custom shades registered on another GhostInk.
+        """
+        try:
+            ordinal = shade.ordinal
+        except AttributeError:
+            raise ValueError("unvalid shade") from None
+        # built-in shades are in every registry, custom ones only in their own
+        if shade.__class__ is CustomShade and (
+            ordinal >= len(self._handlers) or self.registry._by_name.get(shade.name) is not shade
+        ):
+            raise ValueError("unvalid shade")
+        return self._shade_mask >> ordinal & 1
+
+    async def adrop(
+        self,
+        etch_input: Union[str, None] = None,
+        shade: Optional["GhostInk.shade"] = None,
+        echoes: Optional[List[str]] = None,
+        sink: Optional[Sink] = None,
+        sample: Optional[Sampler] = None,
+        value: Optional[float] = None,
+    ) -> None:
+        """
+        `inkdrop` for coroutines. The etch is recorded in memory right away,
+        tagged with the running task when task_echoes is on; sink writes are
+        handed to a background thread (a QueuedSink around the sink, unless it
+        already is one), so file I/O never blocks the event loop.
+
+        Once a sink was used by adrop, its `drop` writes go through the same
+        queue, so lines written from both never interleave.
+
+        Parameters are the same as `inkdrop`.
+        """
+        if shade is None:
+            shade = self.shade.TODO
+        if not self._enabled(shade):
+            # as in inkdrop, no queue or thread for a disabled shade
+            return
+        sink = sink or self.sink
+        if sink is not None:
+            sink = self._nonblocking(sink)
+        self.inkdrop(etch_input, shade, echoes, sink=sink, sample=sample, value=value)
+
+    def _nonblocking(self, sink: Sink) -> Sink:
+        """Returns `sink`, or a QueuedSink writing to it, reused across calls."""
+        if isinstance(sink, QueuedSink):
+            return sink
+        with self._lock:
+            try:
+                return self._nonblocking_sinks[id(sink)][1]
+            except KeyError:
+                queued = QueuedSink(sink)
+                # keep `sink` alive so its id is not reused by another sink
+                self._nonblocking_sinks[id(sink)] = (sink, queued)
+                return queued
+
+    def echo_scope(self, *echoes: str) -> EchoScope:
+        """
+        Adds `echoes` to every drop made inside the returned context manager.
+
+        Scopes follow the current context: concurrent asyncio tasks each keep
+        their own, so the etches of one request can be picked out with
+        `whisper(echo_mask=...)`, e.g. `with ink.echo_scope(f"request-{id}"):`.
+        """
+        return EchoScope(self._format_echoes(echoes))
 
     def whisper(
         self,
         shade_mask: str = None,
         file_mask: str = None,
         echo_mask: Optional[List[str]] = None,
-    ) -> None:
+        replay: bool = False,
+        stream=None,
+        chunk_size: int = 1 << 16,
+        sort: str = "shade",
+        since: Optional[int] = None,
+    ) -> int:
         """
         Prints filtered and sorted etchs based on the provided shade_mask and file_mask.
 
         Parameters:
         - shade_mask (GhostInk.shade): The shade to filter etchs by (default: None).
         - file_mask (str): The filename to filter etchs by (default: None).
+        - echo_mask (List[str]): Keep etches carrying any of these echoes (default: None).
+        - replay (bool): Read the etches back from the sink instead of memory; needs
+          a sink (default: False).
+        - stream (TextIO): Where to write the report (default: None, sys.stdout).
+        - chunk_size (int): Characters buffered before each write (default: 65536).
+        - sort (str): "shade", "frequency" (most hits first) or "recent" (default: "shade").
+        - since (int): Only print etches added, and sampled drops suppressed, after
+          this cursor, as returned by a previous whisper (default: None, every etch).
+
+        Returns:
+        - int: The cursor to pass as `since` to print only the etches added after this report.
+
+        Filtering goes through the indexes of the EtchStore, so its cost follows
+        the number of matching etches rather than the total; with `since` it
+        follows the number of new etches. The report is rendered into chunks of
+        `chunk_size` and written in bulk.
         """
-        # Display Title
-        print(
-            f"""\n{Style.BRIGHT}{Fore.CYAN}{
-                self.title}{Style.RESET_ALL}"""
+        cursor, snapshot = self._report(
+            shade_mask,
+            file_mask,
+            echo_mask,
+            replay,
+            stream,
+            chunk_size,
+            sort,
+            since,
+            self._sampling_baseline(since),
         )
-        formatted_echoes = self._format_echoes(echo_mask)
-        filtered_etches = self.etches.copy()  # Start with all etches
+        self._remember_sampling(cursor, snapshot)
+        return cursor
+
+    def _report(
+        self,
+        shade_mask,
+        file_mask,
+        echo_mask,
+        replay,
+        stream,
+        chunk_size,
+        sort,
+        since,
+        baseline,
+        caller=None,
+    ) -> tuple:
+        """
+        Writes a `whisper` report whose sampling summary counts the drops
+        suppressed after the `baseline` snapshot (every drop if None).
+        `caller` is passed to `_render_whisper`.
+
+        Returns:
+        - tuple: (cursor, sampling snapshot), the `since` and `baseline` of the
+          next incremental report.
+        """
+        stream = sys.stdout if stream is None else stream
+        start = self._stats.render.start()
+        etches, suppressed, cursor, snapshot = self._select_etches(
+            shade_mask, file_mask, echo_mask, replay, sort, since, baseline
+        )
+        parts = self._render_whisper(
+            etches, suppressed, file_mask, self._theme_for(stream), caller
+        )
+        self._write_chunks(stream, parts, chunk_size, start)
+        return cursor, snapshot
+
+    def _sampling_baseline(self, since: Optional[int]):
+        """The sampling snapshot of the report that returned the cursor `since`."""
+        if since is None:
+            return None
+        return self._sampling_at.get(since)
+
+    def _remember_sampling(self, cursor: int, snapshot) -> None:
+        """Keeps `snapshot` for a later `whisper(since=cursor)`, the last few only."""
+        if snapshot is None:
+            return
+        with self._lock:
+            self._sampling_at[cursor] = snapshot
+            self._sampling_at.move_to_end(cursor)
+            if len(self._sampling_at) > _SAMPLING_SNAPSHOTS:
+                self._sampling_at.popitem(last=False)
 
-        # If no masks are provided, print all etches
-        if shade_mask is None and file_mask is None and echo_mask is None:
-            filtered_etches = sorted(filtered_etches, key=lambda x: x[0].value)
+    def whisper_new(
+        self,
+        shade_mask: str = None,
+        file_mask: str = None,
+        echo_mask: Optional[List[str]] = None,
+        stream=None,
+        chunk_size: int = 1 << 16,
+        sort: str = "shade",
+    ) -> int:
+        """
+        Prints the etches added since the previous `whisper_new` call (every
+        etch on the first call), for periodic reports; prints nothing when no
+        etch was added. Etches filtered out by the masks are not printed later
+        either, and repeated drops of an etch already reported only raise its
+        count.
+
+        Parameters are the same as `whisper`.
+
+        Returns:
+        - int: The new cursor.
+        """
+        with self._report_lock:
+            cursor, baseline = self._whisper_at
+            if self.etches.seq == cursor:
+                return cursor
+            # the sampling baseline stays with the cursor, other reports don't move it
+            self._whisper_at = self._report(
+                shade_mask,
+                file_mask,
+                echo_mask,
+                False,
+                stream,
+                chunk_size,
+                sort,
+                cursor,
+                baseline,
+            )
+            return self._whisper_at[0]
+
+    def start_reporter(
+        self,
+        interval: float = 60.0,
+        stream=None,
+        shade_mask: str = None,
+        file_mask: str = None,
+        echo_mask: Optional[List[str]] = None,
+    ):
+        """
+        Prints the etches added since the last report every `interval`
+        seconds from a background thread, skipping rounds with nothing new.
+        A last report is printed when the reporter is closed or at exit.
+        Reports show the line that started the reporter as their printing site.
+
+        Parameters:
+        - interval (float): Seconds between reports (default: 60.0).
+        - stream (TextIO): Where to write the reports (default: None, sys.stdout).
+        - shade_mask, file_mask, echo_mask: Masks applied to each report, as in `whisper`.
+
+        Returns:
+        - Reporter: Call its `close()` to stop it.
+        """
+        from .reporter import Reporter
+
+        return Reporter(self, interval, stream, shade_mask, file_mask, echo_mask)
+
+    async def awhisper(
+        self,
+        shade_mask: str = None,
+        file_mask: str = None,
+        echo_mask: Optional[List[str]] = None,
+        replay: bool = False,
+        stream=None,
+        chunk_size: int = 1 << 16,
+        sort: str = "shade",
+        since: Optional[int] = None,
+    ) -> int:
+        """
+        `whisper` for coroutines. The report is rendered, written to `stream`
+        and logged to the log file in the loop's default executor, so neither
+        console nor file I/O blocks the event loop.
+
+        Parameters and return value are the same as `whisper`.
+        """
+        stream = sys.stdout if stream is None else stream
+        # the caller is resolved here, the executor thread has no user frames
+        caller = callsite.capture(self.stack_offset)
+        start = self._stats.render.start()
+        baseline = self._sampling_baseline(since)
+        etches, suppressed, cursor, snapshot = self._select_etches(
+            shade_mask, file_mask, echo_mask, replay, sort, since, baseline
+        )
+        self._remember_sampling(cursor, snapshot)
+        parts = self._render_whisper(
+            etches, suppressed, file_mask, self._theme_for(stream), caller
+        )
+        import asyncio
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, partial(self._write_chunks, stream, parts, chunk_size, start)
+        )
+        return cursor
+
+    def iter_whisper(
+        self,
+        shade_mask: str = None,
+        file_mask: str = None,
+        echo_mask: Optional[List[str]] = None,
+        replay: bool = False,
+        chunk_size: int = 1 << 16,
+        theme: Theme = None,
+        sort: str = "shade",
+    ):
+        """
+        Yields the `whisper` report in chunks of roughly `chunk_size` characters,
+        for paging through or streaming huge reports.
+
+        Parameters are the same as `whisper`, plus:
+        - theme (Theme): The theme to render with (default: None, picked for sys.stdout).
+        """
+        if theme is None:
+            theme = self._theme_for(sys.stdout)
+        etches, suppressed, _, _ = self._select_etches(
+            shade_mask, file_mask, echo_mask, replay, sort
+        )
+        return self._chunks(
+            self._render_whisper(etches, suppressed, file_mask, theme), chunk_size
+        )
+
+    @staticmethod
+    def _chunks(parts, chunk_size: int):
+        """Joins the report `parts` into chunks of roughly `chunk_size` characters."""
+        chunk = []
+        size = 0
+        for part in parts:
+            chunk.append(part)
+            size += len(part)
+            if size >= chunk_size:
+                yield "".join(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            yield "".join(chunk)
+
+    def _write_chunks(self, stream, parts, chunk_size: int, start=None) -> None:
+        """Writes the report; `start` is the render timer's start time of a timed report."""
+        for chunk in self._chunks(parts, chunk_size):
+            stream.write(chunk)
+        stream.flush()
+        if start is not None:
+            self._stats.render.stop(start)
+
+    def _select_etches(
+        self, shade_mask, file_mask, echo_mask, replay, sort, since=None, baseline=None
+    ) -> tuple:
+        """
+        Returns the etches `whisper` prints, the sampling summary, the cursor
+        of the store they were read from and a snapshot of the sampling
+        counts (None without sampling), taken together so no drop falls
+        between reports. The summary only counts drops suppressed after the
+        `baseline` snapshot (every drop if None).
+        """
+        if replay and self.sink is None:
+            raise ValueError(
+                "replay reads the etches back from a sink, pass one as GhostInk(sink=...)"
+            )
+        if replay:
+            # writes handed off by adrop must land before reading the sink back
+            for _, queued in self._nonblocking_sinks.values():
+                queued.flush()
+        etches = EtchStore(self.sink.replay(self.registry)) if replay else self.etches
+        with self._lock:
+            selected = etches.filter(
+                shade=shade_mask or None,
+                file=file_mask or None,
+                echoes=self._format_echoes(echo_mask) if echo_mask else None,
+                sort=sort,
+                since=since,
+            )
+            sampling = self._sampling
+            suppressed = sampling.suppressed_since(baseline)
+            snapshot = sampling.snapshot() if sampling.counters else None
+            return selected, suppressed, etches.seq, snapshot
+
+    def _render_whisper(self, etches, suppressed, file_mask, theme, caller=None):
+        """
+        Yields the pieces of the `whisper` report for the selected `etches`
+        and `suppressed` sampling counts, logging each etch as it goes.
+        `caller` is the (path, line, function) shown as the printing site
+        (default: None, resolved from the stack).
+        """
+        if theme.color:
+            title_color = Style.BRIGHT + Fore.CYAN
+            printed_color, file_color, line_color = Fore.CYAN, Fore.RED, Fore.YELLOW
+            footer_color = Fore.RED + Style.BRIGHT
         else:
-            # Apply filtering
-            if shade_mask:
-                filtered_etches = {
-                    etch for etch in filtered_etches if etch[0] == shade_mask
-                }
-
-            # Filter by file
-            if file_mask:
-                filtered_etches = {
-                    etch for etch in filtered_etches if etch[2] == file_mask
-                }
-
-            # Filter by echoes
-            if echo_mask:
-                formatted_echoes = self._format_echoes(echo_mask)
-                filtered_etches = {
-                    etch
-                    for etch in filtered_etches
-                    if any(echo in etch[5] for echo in formatted_echoes)
-                }
-
-        sorted_etches = sorted(filtered_etches, key=lambda x: x[0].value)
-
-        # Print etchs
-        for etch_shade, etch, file, line, func, echoes in sorted_etches:
-            print("\n" + self._format_etch(etch_shade, etch, file, line, func, echoes))
+            title_color = printed_color = file_color = line_color = footer_color = ""
+        reset = theme.reset
+
+        # Display Title
+        yield f"\n{title_color}{self.title}{reset}\n"
+
+        # Render etchs
+        for etch in etches:
+            yield "\n" + self._format_etch(
+                etch.shade,
+                etch.text,
+                etch.path,
+                etch.line,
+                etch.func,
+                etch.echoes,
+                etch.trace,
+                theme,
+            ) + self._format_occurrences(etch) + "\n"
 
             # * log to the file
             if self.log_to_file:
-                self.logger.debug(
-                    f"[{etch_shade.name}] - {etch} - {file}:{line} in {func}"
-                )
+                start = self._stats.log.start()
+                self.logger.debug(etch.log_line())
+                if start is not None:
+                    self._stats.log.stop(start)
+
+        # Sampling summary
+        for (code, line_no), seen, dropped in suppressed:
+            site = self._callsites.resolve_code(code, line_no)
+            if file_mask and site.path != file_mask:
+                continue
+            yield (
+                f"\n{footer_color}Suppressed {dropped:,}{reset} of "
+                f"{seen:,} drops at {site.path}:{line_no}\n"
+            )
 
         # Caller information
-        caller_frame = inspect.stack()[1]
-        caller_file = os.path.relpath(caller_frame.filename, start=self.project_root)
-        caller_line = caller_frame.lineno
+        if caller is None:
+            caller = callsite.capture(self.stack_offset)
+        caller_path, caller_line, _ = caller
+        caller_file = os.path.relpath(caller_path, start=self.project_root)
 
-        print(
-            f"""\n{Fore.CYAN}Printed{Style.RESET_ALL} from: {Fore.RED}{caller_file}{
-                Style.RESET_ALL} at line {Fore.YELLOW}{caller_line}{Style.RESET_ALL}"""
-        )
-        print(
-            f"{Fore.RED + Style.BRIGHT}Review completed etchs and remove them as necessary.{Style.RESET_ALL}\n"
+        yield (
+            f"\n{printed_color}Printed{reset} from: {file_color}{caller_file}{reset} "
+            f"at line {line_color}{caller_line}{reset}\n"
         )
+        yield f"{footer_color}Review completed etchs and remove them as necessary.{reset}\n\n"
 
-    def _color_text(self, shade: shade, text: str = "") -> None:
+    def export(self, path: str, format: str = "jsonl") -> int:
         """
-        Color the text based on the debug shade using colorama.
+        Writes the current etches to `path` without colors.
+
+        Parameters:
+        - path (str): The file to write.
+        - format (str): "jsonl" or "binary" (default: "jsonl").
+
+        Returns:
+        - int: The number of etches written.
+        """
+        from . import export
+
+        with self._lock:
+            etches = list(self.etches)
+        if format == "jsonl":
+            return export.dump_jsonl(etches, path)
+        elif format == "binary":
+            return export.dump_binary(etches, path)
+        raise ValueError(f"unvalid export format '{format}', use 'jsonl' or 'binary'")
+
+    def load(self, path: str) -> int:
+        """
+        Merges etches from a file written by `export`, detecting its format.
+        Etches already present are not duplicated.
+
+        Parameters:
+        - path (str): The file to read.
+
+        Returns:
+        - int: The number of etches that were new.
+        """
+        from . import export
+
+        loader = export.load_binary if export.is_binary(path) else export.load_jsonl
+        added = 0
+        with self._lock:
+            etches = self.etches
+            for etch in loader(path, self.registry):
+                added += etches.add(etch)
+        return added
+
+    def _color_text(self, shade: shade, text: str = "", theme: Theme = None) -> str:
+        """
+        Color the text based on the debug shade using the rendering theme.
 
         Parameters:
         - text (str): The text to color.
         - shade (self.shade): The shade that determines the color.
+        - theme (Theme): The theme to render with (default: None, self.theme).
 
         Returns:
         - str: Colored text.
         """
-        background_colors = [
-            Back.BLACK,
-            Back.RED,
-            Back.GREEN,
-            Back.YELLOW,
-            Back.BLUE,
-            Back.MAGENTA,
-            Back.CYAN,
-            Back.WHITE,
-            Back.LIGHTBLACK_EX,
-            Back.LIGHTRED_EX,
-            Back.LIGHTGREEN_EX,
-            Back.LIGHTYELLOW_EX,
-            Back.LIGHTBLUE_EX,
-            Back.LIGHTMAGENTA_EX,
-            Back.LIGHTCYAN_EX,
-            Back.LIGHTWHITE_EX,
-        ]
-        colors = {
-            self.shade.TODO: Fore.YELLOW,
-            self.shade.DEBUG: Fore.BLUE,
-            self.shade.INFO: Fore.MAGENTA,
-            self.shade.WARN: Fore.RED,
-            self.shade.ERROR: Fore.RED + Style.BRIGHT,
-            self.shade._ECHO: random.choice(background_colors) + Style.BRIGHT,
-        }
-
-        # Choose the color for the shade
-        color = colors.get(shade, Style.RESET_ALL)
+        theme = self.theme if theme is None else theme
+        if shade == self.shade._ECHO:
+            return theme.echo(text)
+        return theme.paint(shade.name, text or shade.name)
 
-        if text == "":
-            return f"{color}{shade.name}{Style.RESET_ALL}"
+    def _theme_for(self, stream) -> Theme:
+        """
+        Return the theme to render for `stream`: self.theme unless colors are
+        off, or "auto" and `stream` is not a terminal.
+        """
+        if self.color == "auto":
+            isatty = getattr(stream, "isatty", None)
+            colored = bool(isatty and isatty())
         else:
-            return f"{color}{text}{Style.RESET_ALL}"
+            colored = bool(self.color)
+        if not colored:
+            return PLAIN
+        prepare_console()
+        return self.theme
 
-    def _get_relative_path(self) -> tuple[str, int, str]:
+    def _get_call_site(self, depth: int = 0) -> callsite.CallSite:
+        """
+        Return the cached CallSite of the code calling GhostInk.
+
+        Parameters:
+        - depth (int): Extra frames to skip on top of `stack_offset` (default: 0).
+        """
+        frame = callsite.caller_frame(self.stack_offset + depth)
+        return self._callsites.resolve(frame)
+
+    def _get_relative_path(self, depth: int = 0) -> tuple[str, int, str]:
         """
         Return the relative path and line number of the code file
         calling this method, relative to the project's base directory.
+
+        Parameters:
+        - depth (int): Extra frames to skip on top of `stack_offset` (default: 0).
         """
-        caller_frame = inspect.stack()[3]
-        full_path = caller_frame.filename
-        relative_path = os.path.relpath(full_path, start=self.project_root)
-        return relative_path, caller_frame.lineno, caller_frame.function
+        timer = self._stats.frame_capture
+        start = timer.start()
+        site = self._get_call_site(depth)
+        if start is not None:
+            timer.stop(start)
+        return site.path, site.line, site.func
 
     def _format_etch_from_object(self, etch_input: any) -> str:
         """
         Convert a dictionary or object to a string
-        representation suitable for a etch.
+        representation suitable for a etch, within the formatter's limits.
 
         Parameters:
         - etch_input (dict or object): The input to format.
@@ -263,17 +1057,25 @@ class GhostInk:
         Returns:
         - str: A formatted string representing the etch.
         """
-        if isinstance(etch_input, (dict, list, tuple)):
-            return json.dumps(etch_input, indent=4)
-        elif isinstance(etch_input, set):
-            return json.dumps(list(etch_input), indent=4)
-        elif isinstance(etch_input, str):
-            return etch_input
-        elif hasattr(etch_input, "__dict__"):
-            return json.dumps(etch_input.__dict__, indent=4)
-        else:
-            etch_str = str(etch_input)
-            return f"{etch_str}"
+        timer = self._stats.object_format
+        start = timer.start()
+        text = self.formatter.format(etch_input)
+        if start is not None:
+            timer.stop(start)
+        return text
+
+    def _capture_object(self, etch_input: any):
+        """
+        The etch text for a dropped object: formatted now, or with defer_objects
+        a DeferredText formatted when first displayed.
+        """
+        if (
+            self.defer_objects
+            and self._store.max_bytes is None
+            and not isinstance(etch_input, _FORMATTED_AT_DROP)
+        ):
+            return DeferredText(etch_input, self._format_object)
+        return self._format_etch_from_object(etch_input)
 
     def _format_echoes(self, echoes: List[str] = []):
 
@@ -292,39 +1094,282 @@ class GhostInk:
 
         return tuple(formatted_echoes)
 
-    def _format_etch(self, etch_shade, etch, file, line, func, echoes) -> str:
+    def span(self, name: Union[str, None] = None) -> Span:
+        """
+        Times a block (`with ink.span():`) or every call of a function
+        (`@ink.span()` or `@ink.span`), keeping per-site duration statistics
+        for `span_report`.
+
+        Parameters:
+        - name (str): Label shown in the report (default: None, the function name).
+
+        Returns:
+        - Span: A context manager and decorator; use a new one per `with` block
+          shared between threads or tasks.
+        """
+        if callable(name):
+            return Span(self)(name)
+        return Span(self, name)
+
+    def _record_span(self, key: tuple, name: Optional[str], ns: int) -> None:
+        with self._lock:
+            try:
+                histogram = self._spans[key][1]
+            except KeyError:
+                histogram = LatencyHistogram()
+                self._spans[key] = (name, histogram)
+            histogram.add(ns)
+
+    def span_report(
+        self, stream=None, sort: str = "total", limit: Optional[int] = None
+    ) -> None:
+        """
+        Prints the timed sites with their call count, total, mean, p50, p95,
+        p99 and max durations, like a lightweight profiler.
+
+        Parameters:
+        - stream (TextIO): Where to write the report (default: None, sys.stdout).
+        - sort (str): "total", "mean", "p99" or "count", largest first (default: "total").
+        - limit (int): Only print the first `limit` sites (default: None, all).
+        """
+        stream = sys.stdout if stream is None else stream
+        self._write_chunks(
+            stream, self._render_spans(self._theme_for(stream), sort, limit), 1 << 16
+        )
+
+    def reset_spans(self) -> None:
+        """Forgets every span timing recorded so far."""
+        with self._lock:
+            self._spans.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns what GhostInk itself costs: drops and dedup hits per shade,
+        drops suppressed by samplers, sampled timers for frame capture, stack
+        traces, object formatting, rendering and logging, and the memory held
+        by the etch store. Timers time one call in `stats_sample`, cheap
+        enough to leave on in production.
+
+        Returns:
+        - dict: {"drops", "dedup_hits", "sampled_out", "timers", "store"}; drops and
+          dedup hits map shade names to counts, timers map each step to its calls,
+          sampled calls and mean/p99/max/estimated total nanoseconds.
+        """
+        with self._lock:
+            store = self.etches
+            stats = self._stats
+            names = {shade.ordinal: shade.name for shade in self.registry}
+            new = {names[ordinal]: count for ordinal, count in stats.new.items()}
+            hits = {names[ordinal]: count for ordinal, count in stats.hits.items()}
+            return {
+                "drops": {
+                    name: new.get(name, 0) + hits.get(name, 0)
+                    for name in sorted(new.keys() | hits.keys())
+                },
+                "dedup_hits": hits,
+                "sampled_out": sum(
+                    counter.suppressed for _, counter in self._sampling.suppressed()
+                ),
+                "timers": stats.timers(),
+                "store": {
+                    "etches": len(store),
+                    "bytes": store.nbytes,
+                    "evicted": {shade.name: count for shade, count in store.evicted.items()},
+                },
+            }
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Writes `stats()` to `path` in the Prometheus text format, replacing the
+        file atomically, e.g. for the node_exporter textfile collector. Samples
+        are labelled with instance=<title>.
+        """
+        write_prometheus(path, self.stats(), self.title)
+
+    def _render_spans(self, theme: Theme, sort: str, limit: Optional[int]):
+        keys = {
+            "total": lambda row: row[2].total,
+            "mean": lambda row: row[2].mean,
+            "p99": lambda row: row[2].percentile(99),
+            "count": lambda row: row[2].count,
+        }
+        if sort not in keys:
+            raise ValueError(f"unvalid span sort '{sort}', use one of {sorted(keys)}")
+        with self._lock:
+            rows = [
+                (key, name, histogram) for key, (name, histogram) in self._spans.items()
+            ]
+        rows.sort(key=keys[sort], reverse=True)
+        if limit is not None:
+            rows = rows[:limit]
+
+        title_color = Style.BRIGHT + Fore.CYAN if theme.color else ""
+        site_color = Fore.YELLOW if theme.color else ""
+        reset = theme.reset
+        yield f"\n{title_color}{self.title} spans{reset}\n\n"
+        yield (
+            f"{'calls':>8} {'total':>10} {'mean':>10} {'p50':>10} "
+            f"{'p95':>10} {'p99':>10} {'max':>10}  site\n"
+        )
+        for (code, line_no), name, histogram in rows:
+            site = self._callsites.resolve_code(code, line_no)
+            label = name or site.func
+            yield (
+                f"{histogram.count:>8,} {format_ns(histogram.total):>10} "
+                f"{format_ns(histogram.mean):>10} {format_ns(histogram.percentile(50)):>10} "
+                f"{format_ns(histogram.percentile(95)):>10} "
+                f"{format_ns(histogram.percentile(99)):>10} {format_ns(histogram.max):>10}  "
+                f"{label} {site_color}({site.path}:{line_no}){reset}\n"
+            )
+
+    def scan(
+        self,
+        project_root: Optional[str] = None,
+        markers: Optional[dict] = None,
+        workers: Optional[int] = None,
+        cache: Union[bool, str] = True,
+    ) -> int:
+        """
+        Harvests TODO, FIXME, HACK, XXX, BUG and NOTE comments from the source
+        files under `project_root` into etches of the matching shade.
+        `# TODO(db, perf): text` adds the echoes #db and #perf.
+
+        Rescanning only reads files whose mtime or size changed (see
+        SourceScanner), and etches of comments that were removed go away.
+
+        Parameters:
+        - project_root (str): Directory or file to scan (default: None, the project root).
+        - markers (dict): Marker -> shade name, e.g. {"PERF": "PERF"} for a
+          registered custom shade (default: None, scanner.MARKERS).
+        - workers (int): Process pool size for reading files (default: None, one per CPU).
+        - cache (bool or str): Keep the scan cache in the user cache directory
+          (see scanner.default_cache_path), in this file, or not at all (default: True).
+
+        Returns:
+        - int: The number of new etches.
+        """
+        from .scanner import SourceScanner
+
+        if cache is True:
+            cache = None  # scanner.default_cache_path, outside the project
+        # scanned paths are absolute, "./app.py" and "app.py" are one file
+        scanner = SourceScanner(
+            project_root or self.project_root, markers, cache_path=cache, workers=workers
+        )
+        results = scanner.scan()
+        added = 0
+        with self._lock:
+            etches = self.etches
+            for path in [path for path in self._scanned if scanner.covers(path)]:
+                if path not in results:
+                    for etch in self._scanned.pop(path):
+                        etches.discard(etch)
+            for path, hits in results.items():
+                found = self._scanned_etches(path, hits, scanner.markers)
+                previous = self._scanned.get(path, set())
+                for etch in previous - found:
+                    etches.discard(etch)
+                for etch in found - previous:
+                    added += etches.add(etch)
+                if found:
+                    self._scanned[path] = found
+                else:
+                    self._scanned.pop(path, None)
+        return added
+
+    def _scanned_etches(self, path: str, hits: list, markers: dict) -> set:
+        relative_path = os.path.relpath(path, start=self.project_root)
+        found = set()
+        for line, marker, tags, text in hits:
+            try:
+                shade = self.registry[markers[marker]]
+            except KeyError:
+                raise ValueError(
+                    f"unknown shade '{markers[marker]}' for marker '{marker}'"
+                ) from None
+            if not self.is_enabled(shade):
+                continue
+            if marker != shade.name:
+                text = f"{marker}: {text}" if text else marker
+            found.add(
+                Etch(shade, text, relative_path, line, "<comment>", self._format_echoes(tags))
+            )
+        return found
+
+    def _context_echoes(self, echoes: tuple) -> tuple:
+        """
+        Appends the echoes of the enclosing echo scopes and, with task_echoes,
+        of the running asyncio task to the formatted `echoes`.
+        """
+        extra = scoped_echoes()
+        if self.task_echoes:
+            name = task_name()
+            if name is not None:
+                extra += (task_echo(name),)
+        if not extra:
+            return echoes
+        return echoes + tuple(echo for echo in extra if echo not in echoes)
+
+    def _format_etch(
+        self, etch_shade, etch, file, line, func, echoes, trace=None, theme=None
+    ) -> str:
         """
         Formats a task for printing.
 
         Parameters:
         - etch (tuple): The task tuple to format.
+        - trace (StackTrace or LazyTrace): Stack trace to render after the text (default: None).
+        - theme (Theme): The theme to render with (default: None, self.theme).
 
         Returns:
         - str: The formatted string.
         """
-        filename = file.split("/")[-1]
-        path = "/".join(file.split("/")[:-1])
-        colored_filename = self._color_text(etch_shade, filename)
-        colored_shade = self._color_text(etch_shade)
+        theme = self.theme if theme is None else theme
+        prefix = theme.prefix(etch_shade.name)
+        reset = theme.reset
+        path, filename = callsite.split_path(file)
         if echoes:
-            colored_echoes = (
-                " ".join(
-                    self._color_text(self.shade._ECHO, " " + echo + " ")
-                    for echo in echoes
-                )
-                + "\n"
-            )
-
+            colored_echoes = " ".join(theme.echo(echo) for echo in echoes) + "\n"
         else:
             colored_echoes = ""
+        if trace is not None:
+            etch += f"\nStack Trace:\n{theme.trace(trace.format())}"
         etch += "\n"
 
-        return f"[{colored_shade}] {etch}{colored_echoes}(Ln:{self._color_text(etch_shade, line)} - {func} in {path}/{colored_filename})"
+        colored_filename = f"{prefix}{filename}{reset}"
+        location = f"{path}/{colored_filename}" if path else colored_filename
+
+        return f"[{prefix}{etch_shade.name}{reset}] {etch}{colored_echoes}(Ln:{prefix}{line}{reset} - {func} in {location})"
+
+    def _format_occurrences(self, etch) -> str:
+        """
+        Formats how often and when an etch fired, and its value statistics.
+        Empty for an etch seen once without a value.
+        """
+        parts = []
+        if etch.count > 1:
+            from datetime import datetime
+
+            first = datetime.fromtimestamp(etch.first_seen).strftime("%H:%M:%S.%f")[:-3]
+            last = datetime.fromtimestamp(etch.last_seen).strftime("%H:%M:%S.%f")[:-3]
+            parts.append(f"x{etch.count:,} from {first} to {last}")
+        if etch.values is not None:
+            values = etch.values
+            parts.append(
+                f"value min {values.min:.6g} / avg {values.avg:.6g} / max {values.max:.6g}"
+            )
+        if not parts:
+            return ""
+        return " [" + ", ".join(parts) + "]"
 
-    def _setup_logger(self, log_file, log_level=logging.DEBUG):
+    def _setup_logger(self, log_file, log_level: int = 10):
         """
         Sets up a logger that logs messages to a specified file in a logs directory at the project root.
+        The default level, 10, is logging.DEBUG.
         """
+        import logging
+        from .logsink import AsyncFileWriter
+
         # Get the project root by navigating up from the current file's directory
         base_dir = self.project_root
 
@@ -337,26 +1382,79 @@ class GhostInk:
         # Define the full path for the log file
         log_file_path = os.path.join(log_dir, log_file)
 
-        # Set up logging
-        self.logger = logging.getLogger(__name__)
+        # Set up logging, one logger per log file so instances writing to
+        # different files don't share handlers
+        self.logger = logging.getLogger(f"{__name__}.{os.path.abspath(log_file_path)}")
 
-        # Avoid adding duplicate handlers
-        if not self.logger.hasHandlers():
+        # Avoid adding duplicate handlers; only this logger's own handlers
+        # count, handlers on the root logger must not disable the file
+        if not self.logger.handlers:
             self.logger.setLevel(log_level)
 
-            # File handler to output logs to the specified file
-            file_handler = logging.FileHandler(log_file_path)
-            file_handler.setLevel(log_level)
-
             # Formatter including timestamp, level, and message
             formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-            file_handler.setFormatter(formatter)
+
+            if self.log_async:
+                # Records are queued on the caller's thread and written in
+                # batches by a background writer
+                self._log_writer = AsyncFileWriter(
+                    log_file_path,
+                    formatter,
+                    flush_interval=self.log_flush_interval,
+                    queue_size=self.log_queue_size,
+                )
+                _log_writers[self.logger.name] = self._log_writer
+                file_handler = self._log_writer.handler(self.log_overflow)
+            else:
+                # File handler to output logs to the specified file
+                file_handler = logging.FileHandler(log_file_path)
+                file_handler.setFormatter(formatter)
+            file_handler.setLevel(log_level)
 
             # Add the handler to the logger
             self.logger.addHandler(file_handler)
+        else:
+            self._log_writer = _log_writers.get(self.logger.name)
+
+    def flush_logs(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until queued log records are written to the log file.
+
+        Parameters:
+        - timeout (float): Maximum seconds to wait (default: None, no limit).
+
+        Returns:
+        - bool: False if the background writer did not catch up in time.
+        """
+        if self._log_writer is None:
+            return True
+        return self._log_writer.flush(timeout)
+
+
+class CustomShade:
+    """
+    A shade registered at runtime with `GhostInk.register_shade`. Behaves like
+    a `GhostInk.shade` member: it has a name, value, ordinal and severity.
+    """
+
+    __slots__ = ("name", "value", "ordinal", "severity")
+
+    def __init__(self, name: str, ordinal: int, severity: int):
+        self.name = name
+        self.value = name
+        self.ordinal = ordinal
+        self.severity = severity
+
+    def __repr__(self):
+        return f"<CustomShade.{self.name}: {self.ordinal}>"
 
 
 class ShadeRegistry:
+    """
+    Per-GhostInk shade handlers, created once and looked up by shade ordinal
+    in a flat list. Custom shades get the ordinals after the built-in ones.
+    """
+
     # Dictionary mapping each shade Enum to its corresponding class
     shade_classes = {
         GhostInk.shade.TODO: Todo,
@@ -366,6 +1464,47 @@ class ShadeRegistry:
         GhostInk.shade.ERROR: Error,
     }
 
+    def __init__(self, ghost_ink: GhostInk):
+        self.ghost_ink = ghost_ink
+        self._by_name = {}
+        # handler per shade ordinal; _ECHO gets a plain BaseEtch, which rejects it
+        self.handlers = [None] * len(GhostInk.shade)
+        self._by_name[GhostInk.shade._ECHO.name] = GhostInk.shade._ECHO
+        self.handlers[GhostInk.shade._ECHO.ordinal] = BaseEtch(ghost_ink=ghost_ink)
+        for shade, shade_cls in self.shade_classes.items():
+            self._by_name[shade.name] = shade
+            self.handlers[shade.ordinal] = shade_cls(ghost_ink=ghost_ink)
+
+    def register(self, name: str, handler_cls=None, severity: int = 20):
+        """
+        Adds a custom shade handled by a `handler_cls` singleton.
+
+        Parameters:
+        - name (str): The shade name, shown in whisper output.
+        - handler_cls (type): A BaseEtch subclass (default: None, BaseEtch).
+        - severity (int): Position against min_shade, INFO is 20 (default: 20).
+
+        Returns:
+        - CustomShade: The new shade, to pass to inkdrop.
+        """
+        if name in self._by_name:
+            raise ValueError(f"shade '{name}' is already registered")
+        shade = CustomShade(name, len(self.handlers), severity)
+        self._by_name[name] = shade
+        self.handlers.append((handler_cls or BaseEtch)(ghost_ink=self.ghost_ink))
+        return shade
+
+    def handler(self, shade):
+        """Returns the handler singleton for `shade`."""
+        return self.handlers[shade.ordinal]
+
+    def __getitem__(self, name: str):
+        """Returns the shade called `name`, built-in or custom."""
+        return self._by_name[name]
+
+    def __iter__(self):
+        return iter(self._by_name.values())
+
     @classmethod
     def get_shade_class(cls, shade: GhostInk.shade):
         """Returns the corresponding class for a given shade Enum."""
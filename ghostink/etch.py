@@ -0,0 +1,223 @@
+import sys
+import time
+from .formatting import DeferredText
+from .trace import StackTrace, colorize_trace
+
+# attribute behind each position of the old 6-tuple; None marks etch_text
+_TUPLE_FIELDS = ("shade", None, "path", "line", "func", "echoes")
+
+
+class ValueStats:
+    """
+    Running count, sum, min and max of the numeric values dropped with an etch.
+    """
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self, value: float):
+        self.count = 1
+        self.total = self.min = self.max = value
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+
+    def merge(self, other: "ValueStats") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total": self.total, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ValueStats":
+        stats = cls(data["min"])
+        stats.count = data["count"]
+        stats.total = data["total"]
+        stats.max = data["max"]
+        return stats
+
+
+class Etch:
+    """
+    A single etch: shade, message, call site, echoes and an optional stack trace.
+
+    Equality and hashing use the identity key (shade, call site, echoes, message),
+    computed once. The stack trace is kept out of line and never hashed.
+
+    Dropping an equal etch again does not add a new record: it bumps `count`,
+    `last_seen` and, when a numeric value is dropped, `values` (see `merge`).
+
+    The message may be a DeferredText, an object formatted when `text` is
+    first read.
+
+    Indexing, iteration and unpacking still give the old 6-tuple
+    (shade, etch_text, relative_path, line_no, func_name, echoes), where
+    etch_text includes the colored stack trace.
+    """
+
+    __slots__ = (
+        "shade",
+        "_text",
+        "path",
+        "line",
+        "func",
+        "echoes",
+        "trace",
+        "created",
+        "count",
+        "first_seen",
+        "last_seen",
+        "values",
+        "seq",
+        "_key",
+        "_hash",
+    )
+
+    def __init__(
+        self, shade, text, path, line, func, echoes=(), trace=None, value=None
+    ):
+        self.shade = shade
+        self._text = text
+        self.path = sys.intern(path)
+        self.line = line
+        self.func = sys.intern(func)
+        self.echoes = tuple(sys.intern(echo) for echo in echoes)
+        self.trace = trace
+        self.created = time.monotonic()
+        self.count = 1
+        self.first_seen = self.last_seen = time.time()
+        self.values = None if value is None else ValueStats(value)
+        self.seq = 0  # insertion number, set by the EtchStore
+        self._key = (shade, self.path, line, self.func, self.echoes, text)
+        self._hash = hash(self._key)
+
+    @property
+    def text(self) -> str:
+        """The message, formatting a deferred object on first access."""
+        text = self._text
+        if text.__class__ is not str and isinstance(text, DeferredText):
+            text = self._text = text.format()
+        return text
+
+    def merge(self, other: "Etch") -> None:
+        """
+        Fold the occurrences of an equal etch into this one, in O(1).
+        """
+        self.count += other.count
+        if other.first_seen < self.first_seen:
+            self.first_seen = other.first_seen
+        if other.last_seen > self.last_seen:
+            self.last_seen = other.last_seen
+        if other.values is not None:
+            if self.values is None:
+                self.values = ValueStats.from_dict(other.values.to_dict())
+            else:
+                self.values.merge(other.values)
+
+    @property
+    def etch_text(self) -> str:
+        """The message followed by the colored stack trace, as stored before Etch existed."""
+        if self.trace is None:
+            return self.text
+        return f"{self.text}\nStack Trace:\n{colorize_trace(self.trace.format())}"
+
+    def log_line(self) -> str:
+        """The uncolored single-record form written to log files and text sinks."""
+        text = self.text
+        if self.trace is not None:
+            text += "\nStack Trace:\n" + "".join(self.trace.format())
+        return f"[{self.shade.name}] - {text} - {self.path}:{self.line} in {self.func}"
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable, uncolored view of the etch."""
+        return {
+            "shade": self.shade.name,
+            "text": self.text,
+            "path": self.path,
+            "line": self.line,
+            "func": self.func,
+            "echoes": list(self.echoes),
+            "trace": None if self.trace is None else self.trace.format(),
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "values": None if self.values is None else self.values.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, shades) -> "Etch":
+        """
+        Rebuild an etch from `to_dict` output.
+
+        Parameters:
+        - data (dict): The serialized etch.
+        - shades (ShadeRegistry or Enum): Resolves shade names to shades.
+        """
+        trace = data.get("trace")
+        values = data.get("values")
+        etch = cls(
+            shades[data["shade"]],
+            data["text"],
+            data["path"],
+            data["line"],
+            data["func"],
+            data.get("echoes", ()),
+            None if trace is None else StackTrace(tuple(trace)),
+        )
+        etch.count = data.get("count", 1)
+        etch.first_seen = data.get("first_seen", etch.first_seen)
+        etch.last_seen = data.get("last_seen", etch.last_seen)
+        if values is not None:
+            etch.values = ValueStats.from_dict(values)
+        return etch
+
+    def sizeof(self) -> int:
+        """
+        Approximate bytes held by this etch; interned path/func/echo strings are
+        shared between etches and not counted.
+        """
+        # a deferred object is counted by its wrapper: GhostInk does not defer
+        # under max_bytes, where the payload would have to be counted
+        size = sys.getsizeof(self) + sys.getsizeof(self._text)
+        if self.trace is not None:
+            size += self.trace.sizeof()
+        return size
+
+    def astuple(self) -> tuple:
+        return (self.shade, self.etch_text, self.path, self.line, self.func, self.echoes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.astuple()[index]
+        field = _TUPLE_FIELDS[index]
+        if field is None:
+            return self.etch_text
+        return getattr(self, field)
+
+    def __iter__(self):
+        return iter(self.astuple())
+
+    def __len__(self):
+        return 6
+
+    def __eq__(self, other):
+        if not isinstance(other, Etch):
+            return NotImplemented
+        return self._hash == other._hash and self._key == other._key
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"Etch({self.shade.name}, {self.text!r}, {self.path}:{self.line} in {self.func})"
@@ -0,0 +1,205 @@
+import json
+import mmap
+import struct
+
+from .etch import Etch, ValueStats
+from .trace import StackTrace
+
+MAGIC = b"GINK"
+VERSION = 2
+
+# Binary layout: header, string table (paths, function names, shade names,
+# echoes), then records each prefixed with their byte length.
+_HEADER = struct.Struct("<4sBI")  # magic, version, string count
+_U32 = struct.Struct("<I")
+_RECORD = struct.Struct("<IIIIH")  # shade, path, func, line, echo count
+_OCCURRENCES = struct.Struct("<Idd")  # count, first seen, last seen
+_VALUES = struct.Struct("<Iddd")  # value count (0 if none), total, min, max
+_NO_TRACE = 0xFFFFFFFF
+
+
+def dump_jsonl(etches, path: str) -> int:
+    """
+    Write `etches` to `path` as JSON lines.
+
+    Returns:
+    - int: The number of etches written.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as out:
+        for etch in etches:
+            out.write(json.dumps(etch.to_dict()) + "\n")
+            count += 1
+    return count
+
+
+def load_jsonl(path: str, shades):
+    """
+    Yield the etches stored in a JSONL file.
+
+    Parameters:
+    - path (str): The file to read.
+    - shades (ShadeRegistry or Enum): Resolves shade names to shades.
+    """
+    with _mapped(path) as data:
+        if data is None:
+            return
+        for line in iter(data.readline, b""):
+            if line.strip():
+                yield Etch.from_dict(json.loads(line), shades)
+
+
+def dump_binary(etches, path: str) -> int:
+    """
+    Write `etches` to `path` in the binary format.
+
+    Returns:
+    - int: The number of etches written.
+    """
+    strings = {}
+
+    def index(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    records = []
+    for etch in etches:
+        record = [
+            _RECORD.pack(
+                index(etch.shade.name),
+                index(etch.path),
+                index(etch.func),
+                etch.line,
+                len(etch.echoes),
+            )
+        ]
+        record.extend(_U32.pack(index(echo)) for echo in etch.echoes)
+        record.append(_OCCURRENCES.pack(etch.count, etch.first_seen, etch.last_seen))
+        values = etch.values
+        if values is None:
+            record.append(_VALUES.pack(0, 0.0, 0.0, 0.0))
+        else:
+            record.append(
+                _VALUES.pack(values.count, values.total, values.min, values.max)
+            )
+        record.append(_pack_str(etch.text))
+        if etch.trace is None:
+            record.append(_U32.pack(_NO_TRACE))
+        else:
+            lines = etch.trace.format()
+            record.append(_U32.pack(len(lines)))
+            record.extend(_pack_str(line) for line in lines)
+        payload = b"".join(record)
+        records.append(_U32.pack(len(payload)) + payload)
+
+    with open(path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, VERSION, len(strings)))
+        out.write(b"".join(_pack_str(value) for value in strings))
+        out.write(b"".join(records))
+    return len(records)
+
+
+def load_binary(path: str, shades):
+    """
+    Yield the etches stored in a binary dump.
+
+    Parameters:
+    - path (str): The file to read.
+    - shades (ShadeRegistry or Enum): Resolves shade names to shades.
+    """
+    with _mapped(path) as data:
+        if data is None:
+            return
+        magic, version, string_count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a GhostInk binary dump")
+        if version != VERSION:
+            raise ValueError(f"unsupported GhostInk dump version {version}")
+
+        offset = _HEADER.size
+        strings = []
+        for _ in range(string_count):
+            value, offset = _unpack_str(data, offset)
+            strings.append(value)
+
+        end = len(data)
+        while offset < end:
+            (length,) = _U32.unpack_from(data, offset)
+            offset += _U32.size
+            record_end = offset + length
+            shade, file, func, line, echo_count = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            echoes = []
+            for _ in range(echo_count):
+                echoes.append(strings[_U32.unpack_from(data, offset)[0]])
+                offset += _U32.size
+            count, first_seen, last_seen = _OCCURRENCES.unpack_from(data, offset)
+            offset += _OCCURRENCES.size
+            value_count, total, low, high = _VALUES.unpack_from(data, offset)
+            offset += _VALUES.size
+            text, offset = _unpack_str(data, offset)
+            (line_count,) = _U32.unpack_from(data, offset)
+            offset += _U32.size
+            trace = None
+            if line_count != _NO_TRACE:
+                lines = []
+                for _ in range(line_count):
+                    trace_line, offset = _unpack_str(data, offset)
+                    lines.append(trace_line)
+                trace = StackTrace(tuple(lines))
+            offset = record_end
+            etch = Etch(
+                shades[strings[shade]],
+                text,
+                strings[file],
+                line,
+                strings[func],
+                echoes,
+                trace,
+            )
+            etch.count = count
+            etch.first_seen = first_seen
+            etch.last_seen = last_seen
+            if value_count:
+                etch.values = ValueStats.from_dict(
+                    {"count": value_count, "total": total, "min": low, "max": high}
+                )
+            yield etch
+
+
+def is_binary(path: str) -> bool:
+    """Return True if `path` starts with the binary dump magic."""
+    with open(path, "rb") as dump:
+        return dump.read(len(MAGIC)) == MAGIC
+
+
+def _pack_str(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return _U32.pack(len(encoded)) + encoded
+
+
+def _unpack_str(data, offset: int) -> tuple:
+    (length,) = _U32.unpack_from(data, offset)
+    start = offset + _U32.size
+    return data[start : start + length].decode("utf-8"), start + length
+
+
+class _mapped:
+    """Read-only mmap of a file; yields None for empty files, which cannot be mapped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._map = None
+
+    def __enter__(self):
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+        return self._map
+
+    def __exit__(self, *exc_info):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
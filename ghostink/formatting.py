@@ -0,0 +1,120 @@
+import reprlib
+from itertools import islice
+
+# values json can write as they are
+_SCALARS = (str, int, float, bool, type(None))
+_SEQUENCES = (list, tuple, set, frozenset)
+
+
+class ObjectFormatter:
+    """
+    Turns dropped objects into etch text with bounded cost.
+
+    Dicts, sequences, sets and objects' `__dict__` are written as indented
+    JSON, but only down to `max_depth` levels and `max_items` entries per
+    container, so the work done does not grow with the payload. Values json
+    cannot write fall back to a truncated repr, and the final text is cut at
+    `max_chars`.
+    """
+
+    def __init__(
+        self,
+        max_depth: int = 6,
+        max_items: int = 100,
+        max_chars: int = 10000,
+        indent: int = 4,
+    ):
+        """
+        Parameters:
+        - max_depth (int): Containers nested deeper are summarized, e.g. "<dict with 3 items>" (default: 6).
+        - max_items (int): Entries written per container, the rest are counted (default: 100).
+        - max_chars (int): Maximum length of the text, and of each string in it (default: 10000).
+        - indent (int): JSON indentation (default: 4).
+        """
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.indent = indent
+        self._repr = reprlib.Repr()
+        self._repr.maxstring = self._repr.maxother = max_chars
+
+    def format(self, obj) -> str:
+        """Return the etch text for `obj`."""
+        import json
+
+        if isinstance(obj, str):
+            return self._truncate(obj)
+        if isinstance(obj, (dict,) + _SEQUENCES):
+            pruned = self._prune(obj, 0)
+        elif hasattr(obj, "__dict__"):
+            pruned = self._prune(vars(obj), 0)
+        else:
+            return self._truncate(str(obj))
+        return self._truncate(json.dumps(pruned, indent=self.indent))
+
+    def _prune(self, obj, depth: int):
+        """
+        Return a JSON-serializable copy of `obj` within the depth and item limits.
+        """
+        if isinstance(obj, _SCALARS):
+            if isinstance(obj, str) and len(obj) > self.max_chars:
+                return self._truncate(obj)
+            return obj
+        if isinstance(obj, dict):
+            if depth >= self.max_depth:
+                return f"<dict with {len(obj)} items>"
+            pruned = {}
+            for key, value in islice(obj.items(), self.max_items):
+                if not isinstance(key, _SCALARS):
+                    key = self._repr.repr(key)
+                pruned[key] = self._prune(value, depth + 1)
+            if len(obj) > self.max_items:
+                pruned["..."] = f"{len(obj) - self.max_items} more items"
+            return pruned
+        if isinstance(obj, _SEQUENCES):
+            if depth >= self.max_depth:
+                return f"<{type(obj).__name__} with {len(obj)} items>"
+            pruned = [self._prune(item, depth + 1) for item in islice(obj, self.max_items)]
+            if len(obj) > self.max_items:
+                pruned.append(f"... {len(obj) - self.max_items} more items")
+            return pruned
+        return self._repr.repr(obj)
+
+    def _truncate(self, text: str) -> str:
+        if len(text) <= self.max_chars:
+            return text
+        return f"{text[:self.max_chars]}... ({len(text) - self.max_chars} more characters)"
+
+
+class DeferredText:
+    """
+    An object dropped as an etch, formatted only when the etch text is
+    first needed (whisper, export, logs and sinks).
+
+    The object is kept alive with the etch and compared by identity: dropping
+    the same object again counts another occurrence, other objects are new
+    etches. Mutations made before the first display show up in the text.
+    Used by GhostInk(defer_objects=True).
+    """
+
+    __slots__ = ("obj", "format_object")
+
+    def __init__(self, obj, format_object):
+        """
+        Parameters:
+        - obj: The dropped object.
+        - format_object (callable): Turns `obj` into text, e.g. ObjectFormatter().format.
+        """
+        self.obj = obj
+        self.format_object = format_object
+
+    def format(self) -> str:
+        return self.format_object(self.obj)
+
+    def __eq__(self, other):
+        if not isinstance(other, DeferredText):
+            return NotImplemented
+        return self.obj is other.obj
+
+    def __hash__(self):
+        return id(self.obj)
@@ -0,0 +1,235 @@
+"""
+Opt-in import hook compiling disabled drops out of selected packages.
+
+    from ghostink import importhook
+    importhook.install(["myapp"], min_shade="WARN")
+    import myapp  # DEBUG/TODO/INFO drops and haunts are gone from its bytecode
+
+Statement calls such as `ink.drop(f"...", shade=GhostInk.shade.DEBUG)` whose
+shade is written literally and is below `min_shade` are replaced by `pass`
+at load time, so their arguments are never evaluated. Only the removed
+statements change: every other node keeps its line number. The rewritten
+bytecode is cached next to the regular one under its own optimization tag,
+e.g. `mod.cpython-311.opt-ghostink1a2b3c4d.pyc`.
+"""
+import ast
+import hashlib
+import marshal
+import os
+import sys
+from importlib.machinery import PathFinder, SourceFileLoader
+from importlib.util import MAGIC_NUMBER, cache_from_source
+
+from .core import _SEVERITIES
+
+DROP_METHODS = frozenset(("inkdrop", "drop", "adrop"))
+HAUNT_METHODS = frozenset(("haunt", "ln"))
+# severity given to haunt/ln, which have no shade
+HAUNT_SEVERITY = _SEVERITIES["DEBUG"]
+# version of the rewrite, part of the cache tag
+_REWRITE_VERSION = 1
+
+
+def _shade_name(node):
+    """
+    Return the shade name of a literal `X.shade.NAME`-style node, or None.
+    Strings such as "DEBUG" are not shades, inkdrop rejects them at runtime.
+    """
+    if isinstance(node, ast.Attribute) and node.attr in _SEVERITIES:
+        return node.attr
+    return None
+
+
+def _receiver_name(node):
+    """Return "ink" for `ink.drop` and "self.ink" for `self.ink.drop`."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        owner = _receiver_name(node.value)
+        return None if owner is None else f"{owner}.{node.attr}"
+    return None
+
+
+class DropStripper(ast.NodeTransformer):
+    """
+    Replaces drop and haunt statements below `min_severity` with `pass`.
+
+    Calls are only touched on receivers listed in `names` or assigned from
+    `GhostInk(...)` in the module, so `frame.drop(...)` on other objects is
+    left alone. Drops whose shade is not written literally are kept.
+    """
+
+    def __init__(self, min_severity: int, names=()):
+        self.min_severity = min_severity
+        self.names = set(names)
+        self.removed = 0
+
+    def visit_Module(self, node):
+        for child in ast.walk(node):
+            if isinstance(child, (ast.Assign, ast.AnnAssign)) and self._builds_ghost_ink(
+                child.value
+            ):
+                targets = child.targets if isinstance(child, ast.Assign) else [child.target]
+                for target in targets:
+                    name = _receiver_name(target)
+                    if name is not None:
+                        self.names.add(name)
+        return self.generic_visit(node)
+
+    @staticmethod
+    def _builds_ghost_ink(value) -> bool:
+        if not isinstance(value, ast.Call):
+            return False
+        func = value.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+        return name == "GhostInk"
+
+    def visit_Expr(self, node):
+        call = node.value.value if isinstance(node.value, ast.Await) else node.value
+        if isinstance(call, ast.Call) and self._disabled(call):
+            self.removed += 1
+            return ast.copy_location(ast.Pass(), node)
+        return node
+
+    def _disabled(self, call: ast.Call) -> bool:
+        func = call.func
+        if not isinstance(func, ast.Attribute) or _receiver_name(func.value) not in self.names:
+            return False
+        if func.attr in HAUNT_METHODS:
+            return HAUNT_SEVERITY < self.min_severity
+        if func.attr not in DROP_METHODS:
+            return False
+        shade = None
+        for keyword in call.keywords:
+            if keyword.arg == "filename":
+                return False  # scans files, has no shade of its own
+            if keyword.arg == "shade":
+                shade = keyword.value
+        if shade is None and len(call.args) > 1:
+            shade = call.args[1]
+        if any(isinstance(arg, ast.Starred) for arg in call.args) or any(
+            keyword.arg is None for keyword in call.keywords
+        ):
+            return False  # *args / **kwargs may carry the shade
+        name = "TODO" if shade is None else _shade_name(shade)
+        return name is not None and _SEVERITIES[name] < self.min_severity
+
+
+class StrippingLoader(SourceFileLoader):
+    """SourceFileLoader compiling through DropStripper, with its own pyc cache."""
+
+    def __init__(self, fullname, path, finder):
+        super().__init__(fullname, path)
+        self.finder = finder
+
+    def source_to_code(self, data, path, *, _optimize=-1):
+        tree = ast.parse(data, filename=path)
+        stripper = DropStripper(self.finder.min_severity, self.finder.names)
+        tree = stripper.visit(tree)
+        self.finder.compiled += 1
+        return compile(tree, path, "exec", dont_inherit=True, optimize=_optimize)
+
+    def get_code(self, fullname):
+        source_path = self.get_filename(fullname)
+        cache_path = cache_from_source(source_path, optimization=self.finder.tag)
+        stats = self.path_stats(source_path)
+        header = (
+            MAGIC_NUMBER
+            + (0).to_bytes(4, "little")  # flags: timestamp based
+            + (int(stats["mtime"]) & 0xFFFFFFFF).to_bytes(4, "little")
+            + (stats["size"] & 0xFFFFFFFF).to_bytes(4, "little")
+        )
+        try:
+            with open(cache_path, "rb") as cached:
+                data = cached.read()
+        except OSError:
+            pass
+        else:
+            if data[:16] == header:
+                try:
+                    return marshal.loads(data[16:])
+                except (EOFError, ValueError, TypeError):
+                    pass  # corrupt cache, rebuild it
+        code = self.source_to_code(self.get_data(source_path), source_path)
+        if not sys.dont_write_bytecode:
+            self._write_cache(cache_path, header + marshal.dumps(code))
+        return code
+
+    @staticmethod
+    def _write_cache(cache_path: str, data: bytes) -> None:
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(temp_path, "wb") as cache:
+                cache.write(data)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass  # read-only install, compile again next time
+
+
+class GhostInkFinder:
+    """
+    Meta path finder handing the modules of `packages` to StrippingLoader.
+    See `install`.
+    """
+
+    def __init__(self, packages, min_shade, names=("ink",)):
+        self.packages = tuple(packages)
+        name = getattr(min_shade, "name", min_shade).strip().upper()
+        if name not in _SEVERITIES:
+            raise ValueError(f"unvalid min_shade '{min_shade}', use one of {list(_SEVERITIES)}")
+        self.min_shade = name
+        self.min_severity = _SEVERITIES[name]
+        self.names = tuple(names)
+        self.compiled = 0  # modules rewritten from source, not loaded from cache
+        # compiled at the interpreter's -O level, which must not share a cache
+        config = repr(
+            (_REWRITE_VERSION, self.min_severity, sorted(self.names), sys.flags.optimize)
+        )
+        self.tag = "ghostink" + hashlib.sha1(config.encode()).hexdigest()[:8]
+
+    def _selected(self, fullname: str) -> bool:
+        return any(
+            fullname == package or fullname.startswith(package + ".")
+            for package in self.packages
+        )
+
+    def find_spec(self, fullname, path=None, target=None):
+        if not self._selected(fullname):
+            return None
+        spec = PathFinder.find_spec(fullname, path)
+        if spec is None or not isinstance(spec.loader, SourceFileLoader):
+            return spec
+        spec.loader = StrippingLoader(fullname, spec.origin, self)
+        return spec
+
+    def invalidate_caches(self):
+        pass
+
+
+def install(packages, min_shade=None, names=("ink",)) -> GhostInkFinder:
+    """
+    Compile drops below `min_shade` out of `packages` when they are imported.
+    Modules imported before the call are not rewritten.
+
+    Parameters:
+    - packages (List[str]): Top-level packages or modules to rewrite, e.g. ["myapp"].
+    - min_shade (str or GhostInk.shade): Lowest shade kept; haunt/ln count as DEBUG
+      (default: None, GHOSTINK_MIN_SHADE or "INFO").
+    - names (tuple of str): Receivers whose drops are rewritten, e.g. "ink" or
+      "self.ink", on top of names assigned from GhostInk(...) (default: ("ink",)).
+
+    Returns:
+    - GhostInkFinder: The installed finder, for `uninstall`.
+    """
+    if min_shade is None:
+        min_shade = os.environ.get("GHOSTINK_MIN_SHADE") or "INFO"
+    finder = GhostInkFinder(packages, min_shade, names)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def uninstall(finder: GhostInkFinder) -> None:
+    """Remove a finder added by `install`; modules already imported stay rewritten."""
+    if finder in sys.meta_path:
+        sys.meta_path.remove(finder)
@@ -0,0 +1,170 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import weakref
+
+from .sinks import close_in_child_at_exit
+
+_STOP = object()
+
+# live writers, restarted in forked children
+_writers = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for writer in list(_writers):
+        writer._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class _Flush:
+    """Marker put on the queue; its event is set once everything before it is written."""
+
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue that either drops records or blocks
+    the caller when the queue is full.
+    """
+
+    def __init__(self, record_queue: queue.Queue, overflow: str = "drop"):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"unvalid overflow policy '{overflow}', use 'drop' or 'block'")
+        super().__init__(record_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def enqueue(self, record) -> None:
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AsyncFileWriter:
+    """
+    Background thread that drains a queue of log records and appends them to
+    a file in batches, one write per batch.
+
+    A batch is written when `batch_size` records are pending or when
+    `flush_interval` seconds passed since the previous write, however
+    steadily records arrive. Pending records are written at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        formatter: logging.Formatter,
+        flush_interval: float = 1.0,
+        queue_size: int = 10000,
+        batch_size: int = 512,
+    ):
+        self.filename = filename
+        self.formatter = formatter
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._handlers = weakref.WeakSet()
+        self._closed = False
+        self._start()
+        _writers.add(self)
+        atexit.register(self.close)
+
+    def _start(self) -> None:
+        self._stream = open(self.filename, "a", encoding="utf-8", buffering=1 << 16)
+        self._thread = threading.Thread(
+            target=self._run, name="ghostink-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Start a new writer thread in a forked child, which has no copy of
+        the parent's. Records the parent had queued are left to the parent.
+        """
+        if self._closed:
+            return
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        for handler in self._handlers:
+            handler.queue = self.queue
+        self._start()
+        close_in_child_at_exit(self)
+
+    def handler(self, overflow: str = "drop") -> BoundedQueueHandler:
+        """Return a logging handler feeding this writer."""
+        handler = BoundedQueueHandler(self.queue, overflow)
+        self._handlers.add(handler)
+        return handler
+
+    def _run(self) -> None:
+        pending = []
+        last_write = time.monotonic()
+        while True:
+            timeout = None  # nothing pending, nothing due
+            if pending:
+                timeout = max(0.0, last_write + self.flush_interval - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, logging.LogRecord):
+                pending.append(self.formatter.format(item) + "\n")
+            elif isinstance(item, _Flush):
+                self._write(pending)
+                last_write = time.monotonic()
+                item.done.set()
+            elif item is _STOP:
+                self._write(pending)
+                self._stream.close()
+                return
+
+            if pending and (
+                len(pending) >= self.batch_size
+                or time.monotonic() - last_write >= self.flush_interval
+            ):
+                self._write(pending)
+                last_write = time.monotonic()
+
+    def _write(self, pending: list) -> None:
+        if pending:
+            self._stream.write("".join(pending))
+            self._stream.flush()
+            pending.clear()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Block until every record queued so far is written.
+
+        Returns:
+        - bool: False if the writer did not catch up within `timeout`, or
+          records are queued with no thread left to write them.
+        """
+        if not self._thread.is_alive():
+            return self.queue.empty()
+        marker = _Flush()
+        self.queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self) -> None:
+        """Write pending records, close the file and stop the thread."""
+        self._closed = True
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+        atexit.unregister(self.close)
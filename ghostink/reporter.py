@@ -0,0 +1,76 @@
+import atexit
+import sys
+import threading
+
+from . import callsite
+
+
+class Reporter:
+    """
+    Prints the etches a GhostInk gained since its previous report, every
+    `interval` seconds from a background thread, on `report()`, and once
+    more on `close()` or at exit. Each report costs in proportion to the new
+    etches, however many the store holds. Reports are printed from the line
+    that created the reporter. See `GhostInk.start_reporter`.
+    """
+
+    def __init__(
+        self,
+        ghost_ink,
+        interval: float = 60.0,
+        stream=None,
+        shade_mask=None,
+        file_mask=None,
+        echo_mask=None,
+    ):
+        self.ghost_ink = ghost_ink
+        self.interval = interval
+        self.stream = stream
+        self.masks = {"shade_mask": shade_mask, "file_mask": file_mask, "echo_mask": echo_mask}
+        # shown as the printing site of every report, the thread has no user frames
+        self.caller = callsite.capture(ghost_ink.stack_offset)
+        self.cursor = 0  # independent of whisper_new's cursor
+        self._baseline = None  # sampling snapshot of the previous report
+        self._report_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="ghostink-reporter", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def report(self) -> bool:
+        """
+        Print the etches added since the last report, if any.
+
+        Returns:
+        - bool: True if a report was printed.
+        """
+        with self._report_lock:
+            if self.ghost_ink.etches.seq == self.cursor:
+                return False
+            stream = sys.stdout if self.stream is None else self.stream
+            self.cursor, self._baseline = self.ghost_ink._report(
+                replay=False,
+                stream=stream,
+                chunk_size=1 << 16,
+                sort="shade",
+                since=self.cursor,
+                baseline=self._baseline,
+                caller=self.caller,
+                **self.masks,
+            )
+            return True
+
+    def close(self) -> None:
+        """Stop the background thread and print what is left."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.report()
+        atexit.unregister(self.close)
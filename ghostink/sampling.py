@@ -0,0 +1,147 @@
+import time
+
+
+class SiteCounter:
+    """
+    Per-call-site sampling state: drops seen and suppressed, plus the
+    token bucket fill when a TokenBucket sampler is used.
+    """
+
+    __slots__ = ("seen", "suppressed", "tokens", "stamp")
+
+    def __init__(self):
+        self.seen = 0
+        self.suppressed = 0
+        self.tokens = None
+        self.stamp = 0.0
+
+
+class Sampler:
+    """
+    Decides whether a drop at a call site is recorded. Samplers hold only
+    their configuration; per-site state lives in a SiteCounter, so one
+    sampler can be shared by every call site.
+    """
+
+    def allow(self, counter: SiteCounter) -> bool:
+        raise NotImplementedError
+
+
+class EveryN(Sampler):
+    """Records the 1st, (n+1)th, (2n+1)th... drop of each call site."""
+
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        self.n = n
+
+    def allow(self, counter: SiteCounter) -> bool:
+        return (counter.seen - 1) % self.n == 0
+
+
+class Probability(Sampler):
+    """Records each drop with probability `p`."""
+
+    def __init__(self, p: float, rng=None):
+        """
+        Parameters:
+        - p (float): Probability of recording a drop, 0 to 1.
+        - rng (random.Random): Source of randomness (default: None, the random module).
+        """
+        if not 0.0 <= p <= 1.0:
+            raise ValueError("p must be between 0 and 1")
+        self.p = p
+        if rng is None:
+            import random as rng
+        self._random = rng.random
+
+    def allow(self, counter: SiteCounter) -> bool:
+        return self._random() < self.p
+
+
+class TokenBucket(Sampler):
+    """
+    Records up to `rate` drops per second per call site, allowing bursts of
+    up to `burst` drops (default: `rate`).
+    """
+
+    def __init__(self, rate: float, burst: float = None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = rate if burst is None else burst
+        self._clock = clock
+
+    def allow(self, counter: SiteCounter) -> bool:
+        now = self._clock()
+        if counter.tokens is None:
+            counter.tokens = self.burst
+        else:
+            counter.tokens = min(
+                self.burst, counter.tokens + (now - counter.stamp) * self.rate
+            )
+        counter.stamp = now
+        if counter.tokens >= 1.0:
+            counter.tokens -= 1.0
+            return True
+        return False
+
+
+class SiteSampling:
+    """
+    SiteCounters keyed on (code object, line number) of the dropping line.
+    """
+
+    def __init__(self):
+        self.counters = {}
+
+    def allow(self, sampler: Sampler, frame) -> bool:
+        """
+        Count a drop from `frame` and return whether `sampler` keeps it.
+        """
+        key = (frame.f_code, frame.f_lineno)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = SiteCounter()
+        counter.seen += 1
+        if sampler.allow(counter):
+            return True
+        counter.suppressed += 1
+        return False
+
+    def suppressed(self):
+        """
+        Yield ((code object, line number), SiteCounter) for sites that
+        suppressed drops, most suppressed first.
+        """
+        return sorted(
+            (
+                (key, counter)
+                # list() copies atomically, drops may add sites meanwhile
+                for key, counter in list(self.counters.items())
+                if counter.suppressed
+            ),
+            key=lambda item: item[1].suppressed,
+            reverse=True,
+        )
+
+    def snapshot(self) -> dict:
+        """Return {(code object, line number): (seen, suppressed)} as of now."""
+        return {
+            key: (counter.seen, counter.suppressed)
+            for key, counter in list(self.counters.items())
+        }
+
+    def suppressed_since(self, snapshot: dict = None) -> list:
+        """
+        Return [((code object, line number), seen, suppressed)] counted after
+        `snapshot`, most suppressed first; totals when `snapshot` is None.
+        """
+        deltas = []
+        for key, counter in list(self.counters.items()):
+            seen, suppressed = (snapshot or {}).get(key, (0, 0))
+            if counter.suppressed > suppressed:
+                deltas.append((key, counter.seen - seen, counter.suppressed - suppressed))
+        deltas.sort(key=lambda item: item[2], reverse=True)
+        return deltas
+
+    def clear(self) -> None:
+        self.counters.clear()
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+# comment marker -> shade name
+MARKERS = {
+    "TODO": "TODO",
+    "FIXME": "WARN",
+    "HACK": "WARN",
+    "XXX": "WARN",
+    "BUG": "ERROR",
+    "NOTE": "INFO",
+}
+
+EXTENSIONS = frozenset(
+    (
+        ".py", ".pyi", ".pyx", ".js", ".jsx", ".ts", ".tsx", ".c", ".h", ".cc",
+        ".cpp", ".hpp", ".go", ".rs", ".java", ".kt", ".rb", ".sh", ".sql",
+        ".toml", ".yaml", ".yml", ".cfg", ".ini",
+    )
+)
+
+SKIP_DIRS = frozenset(
+    (
+        ".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv",
+        ".tox", ".nox", ".mypy_cache", ".pytest_cache", "build", "dist", "logs",
+    )
+)
+
+CACHE_VERSION = 2  # paths are absolute since version 2
+
+# below this many files to read, a process pool costs more than it saves
+_POOL_THRESHOLD = 64
+
+
+@lru_cache(maxsize=8)
+def _pattern(markers: tuple):
+    # a comment opener (#, //, /*, --, ;), the marker, optional (tags), the text
+    return re.compile(
+        rb"(?:#|//|/\*|--|;)[ \t]*("
+        + b"|".join(re.escape(marker.encode("ascii")) for marker in markers)
+        + rb")\b(?:\(([^)\n]*)\))?:?[ \t]*([^\n]*)"
+    )
+
+
+def scan_file(path: str, markers: tuple, digest: str = None) -> tuple:
+    """
+    Read `path` in one unbuffered read and find its comment markers.
+
+    Parameters:
+    - path (str): The file to read.
+    - markers (tuple of str): The markers to look for.
+    - digest (str): The cached content hash; if it still matches the file
+      is not parsed again and hits is None (default: None).
+
+    Returns:
+    - tuple: (path, mtime_ns, size, digest, hits) where hits are
+      [line, marker, tags, text] lists; digest is None for binary files.
+    """
+    stat = os.stat(path)
+    with open(path, "rb", buffering=0) as source:
+        data = source.read()
+    if b"\0" in data[:8192]:
+        return path, stat.st_mtime_ns, stat.st_size, None, []
+    new_digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if new_digest == digest:
+        return path, stat.st_mtime_ns, stat.st_size, digest, None
+    return path, stat.st_mtime_ns, stat.st_size, new_digest, _find(data, markers)
+
+
+def _find(data: bytes, markers: tuple) -> list:
+    hits = []
+    line = 1
+    offset = 0
+    for match in _pattern(markers).finditer(data):
+        line += data.count(b"\n", offset, match.start())
+        offset = match.start()
+        tags = match.group(2) or b""
+        tags = [tag.strip() for tag in tags.decode("utf-8", "replace").split(",")]
+        text = match.group(3).decode("utf-8", "replace").rstrip()
+        if text.endswith("*/"):
+            text = text[:-2].rstrip()
+        hits.append([line, match.group(1).decode("ascii"), [t for t in tags if t], text])
+    return hits
+
+
+def default_cache_path(root: str) -> str:
+    """
+    The cache file for scans of `root`, in the user cache directory
+    ($XDG_CACHE_HOME or ~/.cache) so the scanned tree is left untouched.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    digest = hashlib.blake2b(os.path.abspath(root).encode(), digest_size=8).hexdigest()
+    return os.path.join(base, "ghostink", f"scan-{digest}.json")
+
+
+def source_files(root: str, extensions=EXTENSIONS):
+    """Yield the source files under `root`, skipping VCS, cache and build directories."""
+    if os.path.isfile(root):
+        yield root
+        return
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if name not in SKIP_DIRS]
+        for name in files:
+            if os.path.splitext(name)[1] in extensions:
+                yield os.path.join(directory, name)
+
+
+class SourceScanner:
+    """
+    Finds comment markers (TODO, FIXME, ...) in source files.
+
+    Results are cached per file with its mtime, size and content hash in a
+    JSON file, so a rescan only reads files whose mtime or size changed and
+    only parses those whose content changed. Files to read are spread over
+    a process pool once there are enough of them.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        markers: dict = None,
+        extensions=EXTENSIONS,
+        cache_path: str = None,
+        workers: int = None,
+    ):
+        """
+        Parameters:
+        - root (str): Directory (or single file) to scan.
+        - markers (dict): Marker -> shade name (default: None, MARKERS).
+        - extensions (set of str): File suffixes scanned (default: EXTENSIONS).
+        - cache_path (str): The cache file, False to disable caching
+          (default: None, see `default_cache_path`).
+        - workers (int): Process pool size (default: None, one per CPU).
+
+        Paths are made absolute, so the same file is one entry however it was named.
+        """
+        self.root = root = os.path.abspath(root)
+        self.markers = dict(MARKERS if markers is None else markers)
+        self.extensions = frozenset(extensions)
+        if cache_path is None:
+            cache_path = default_cache_path(root)
+        self.cache_path = cache_path
+        self.workers = workers
+        self.read = 0  # files read by the last scan
+
+    def scan(self) -> dict:
+        """
+        Returns:
+        - dict: path -> [line, marker, tags, text] hits, for every scanned file.
+        """
+        markers = tuple(sorted(self.markers))
+        cache = self._load_cache(markers)
+        results = {}
+        stale = []
+        for path in source_files(self.root, self.extensions):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = cache.get(path)
+            if (
+                entry is not None
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and entry["size"] == stat.st_size
+            ):
+                results[path] = entry["hits"]
+            else:
+                stale.append(path)
+
+        self.read = len(stale)
+        digests = [cache[path]["digest"] if path in cache else None for path in stale]
+        for path, mtime_ns, size, digest, hits in self._read(stale, digests, markers):
+            if hits is None:
+                hits = cache[path]["hits"]  # touched but unchanged
+            cache[path] = {"mtime_ns": mtime_ns, "size": size, "digest": digest, "hits": hits}
+            results[path] = hits
+
+        # forget files deleted from under root, keep other roots sharing the cache
+        gone = [path for path in cache if path not in results and self.covers(path)]
+        for path in gone:
+            del cache[path]
+        if stale or gone:
+            self._save_cache(markers, cache)
+        return results
+
+    def covers(self, path: str) -> bool:
+        """Return True if `path` is the scanned file or lies under the scanned directory."""
+        if os.path.isfile(self.root):
+            return path == self.root
+        return path.startswith(os.path.join(self.root, ""))
+
+    def _read(self, paths: list, digests: list, markers: tuple):
+        markers = [markers] * len(paths)
+        if len(paths) < _POOL_THRESHOLD or self.workers == 1:
+            results = map(_scan_or_none, paths, markers, digests)
+            yield from filter(None, results)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(paths) // (workers * 8))
+            results = pool.map(_scan_or_none, paths, markers, digests, chunksize=chunksize)
+            yield from filter(None, results)
+
+    def _load_cache(self, markers: tuple) -> dict:
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as cache:
+                data = json.load(cache)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION or data.get("markers") != list(markers):
+            return {}
+        return data["files"]
+
+    def _save_cache(self, markers: tuple, files: dict) -> None:
+        if not self.cache_path:
+            return
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as cache:
+                json.dump(
+                    {"version": CACHE_VERSION, "markers": list(markers), "files": files},
+                    cache,
+                )
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass  # a read-only tree still gets scanned, just not cached
+
+
+def _scan_or_none(path: str, markers: tuple, digest: str):
+    try:
+        return scan_file(path, markers, digest)
+    except OSError:
+        return None
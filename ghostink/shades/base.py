@@ -1,11 +1,41 @@
-import traceback
-from colorama import Fore, Back, Style, init
+from ..etch import Etch
+from ..trace import LazyTrace, StackTrace
 
 
 class BaseEtch:
+    # Extra frames to skip when resolving the caller. Subclasses defined
+    # outside the ghostink package add their own inker frames here.
+    depth_offset = 0
+
+    # Whether etches of this shade carry a stack trace. None keeps the
+    # default: ERROR, DEBUG and WARN are traced, other shades are not.
+    capture_trace = None
+
     def __init__(self, ghost_ink):
         self.ghost_ink = ghost_ink
 
+    def format_input(self, etch_input) -> str:
+        """
+        Turn the dropped object into the etch text; override for custom formatting.
+        Objects are formatted at drop time, or when first displayed if the
+        GhostInk uses defer_objects.
+        """
+        if isinstance(etch_input, str):
+            return etch_input
+        return self.ghost_ink._capture_object(etch_input)
+
+    def wants_trace(self, shade) -> bool:
+        """
+        Return True if etches of `shade` should carry a stack trace.
+        """
+        if self.capture_trace is not None:
+            return self.capture_trace
+        return shade in (
+            self.ghost_ink.shade.ERROR,
+            self.ghost_ink.shade.DEBUG,
+            self.ghost_ink.shade.WARN,
+        )
+
     def inker(self, etch_input, shade, echoes, **kwargs) -> None:
         """
         Add a etch with specified text and shade to the Debugger's
@@ -15,44 +45,49 @@ class BaseEtch:
         - etch_input (str or dict or object): The text or object to be added as a etch.
         - shade (GhostInk.shade): The shade of the etch (default: GhostInk.shade.TODO).
         - Echoes: (List of str): Tags added to the etch (task) for customized filtering
-        If etch_input is a dictionary or object, it is formatted using _format_etch_from_object method.
+        If etch_input is a dictionary or object, it is formatted using format_input method.
         The relative path, line number, and function name of the caller are obtained using _get_relative_path method.
-        If shade is ERROR or DEBUG, stack trace is added to the etch text.
-        The etch is added to the etch list if it's not already present.
+        Echoes of the enclosing echo scopes and the running asyncio task are added to `echoes`.
+        If wants_trace(shade) (ERROR, DEBUG or WARN by default), a stack trace is stored alongside the etch:
+        formatted now, or as a LazyTrace when the GhostInk uses lazy_traces.
+        The etch is added to the etch list if it's not already present, otherwise the
+        stored etch counts another occurrence (and the `value` keyword argument, if any).
+        New etches are written to the `sink` keyword argument or the GhostInk's sink.
         """
         if shade == self.ghost_ink.shade._ECHO:
             raise ValueError(
                 "Attempted to use shade '_ECHO', which is not allowed for etch addition."
             )
 
-        if isinstance(etch_input, str):
-            etch_text = etch_input
-        else:
-            etch_text = self.ghost_ink._format_etch_from_object(etch_input)
+        etch_text = self.format_input(etch_input)
 
-        relative_path, line_no, func_name = self.ghost_ink._get_relative_path()
+        relative_path, line_no, func_name = self.ghost_ink._get_relative_path(
+            self.depth_offset
+        )
 
-        if shade in [
-            self.ghost_ink.shade.ERROR,
-            self.ghost_ink.shade.DEBUG,
-            self.ghost_ink.shade.WARN,
-        ]:
-            stack_trace = traceback.format_stack()
-            colored_stack_trace = "".join(
-                f"{Style.BRIGHT}{Fore.RED + Style.DIM}{line}{Style.RESET_ALL}"
-                for line in stack_trace
+        stack_trace = None
+        if self.wants_trace(shade):
+            timer = self.ghost_ink._stats.stack_trace
+            start = timer.start()
+            trace_cls = LazyTrace if self.ghost_ink.lazy_traces else StackTrace
+            stack_trace = trace_cls.capture(
+                self.ghost_ink.stack_offset + self.depth_offset
             )
-            etch_text += f"\nStack Trace:\n{colored_stack_trace}"
+            if start is not None:
+                timer.stop(start)
 
-        formatted_echoes = self.ghost_ink._format_echoes(echoes)
-        formatted_etch = (
+        formatted_echoes = self.ghost_ink._context_echoes(
+            self.ghost_ink._format_echoes(echoes)
+        )
+        formatted_etch = Etch(
             shade,
             etch_text,
             relative_path,
             line_no,
             func_name,
             formatted_echoes,
+            stack_trace,
+            kwargs.get("value"),
         )
 
-        if formatted_etch not in self.ghost_ink.etches:
-            self.ghost_ink.etches.add(formatted_etch)
+        self.ghost_ink._record(formatted_etch, kwargs.get("sink"))
@@ -0,0 +1,201 @@
+import atexit
+import os
+import sys
+import threading
+import weakref
+
+from .etch import Etch
+
+_STOP = object()
+
+# live QueuedSinks, restarted in forked children
+_queued_sinks = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for sink in list(_queued_sinks):
+        sink._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def close_in_child_at_exit(closeable) -> None:
+    """
+    Call `closeable.close()` when a forked child exits. Children started by
+    multiprocessing skip atexit and clear their finalizers after the fork
+    hooks ran, so the finalizer is registered from its after-fork callbacks.
+    """
+    util = sys.modules.get("multiprocessing.util")
+    if util is not None:
+        util.register_after_fork(closeable, _register_finalizer)
+
+
+def _register_finalizer(closeable) -> None:
+    sys.modules["multiprocessing.util"].Finalize(closeable, closeable.close, exitpriority=5)
+
+
+class Sink:
+    """
+    Destination for etches as they are dropped, see GhostInk(sink=...).
+
+    Subclasses implement `write`; sinks that can read their output back
+    implement `replay` so `whisper(replay=True)` can render from them.
+    """
+
+    def write(self, etch: Etch) -> None:
+        raise NotImplementedError
+
+    def replay(self, shades):
+        """
+        Yield the etches written so far.
+
+        Parameters:
+        - shades (ShadeRegistry or Enum): Resolves shade names to shades.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot replay its etches")
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class StreamSink(Sink):
+    """Writes each etch as an uncolored log line to a text stream (stdout by default)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, etch: Etch) -> None:
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(etch.log_line() + "\n")
+
+    def flush(self) -> None:
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.flush()
+
+
+class FileSink(StreamSink):
+    """Appends each etch as an uncolored log line to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        super().__init__(open(path, "a", encoding="utf-8", buffering=1))
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+class JsonlSink(Sink):
+    """
+    Appends each etch as one JSON object per line. Lines are flushed as they
+    are written, so a crash loses at most the etch being written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def write(self, etch: Etch) -> None:
+        import json
+
+        self._file.write(json.dumps(etch.to_dict()) + "\n")
+
+    def replay(self, shades):
+        import json
+
+        self._file.flush()
+        with open(self.path, encoding="utf-8") as lines:
+            for line in lines:
+                if line.strip():
+                    yield Etch.from_dict(json.loads(line), shades)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class QueuedSink(Sink):
+    """
+    Hands etches to another sink through a bounded queue drained by a
+    background thread, so slow sinks never block the dropping thread.
+
+    Parameters:
+    - sink (Sink): The sink doing the actual writes.
+    - queue_size (int): Etches buffered before `overflow` applies (default: 10000).
+    - overflow (str): "drop" or "block" when the queue is full (default: "drop").
+    """
+
+    def __init__(self, sink: Sink, queue_size: int = 10000, overflow: str = "drop"):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"unvalid overflow policy '{overflow}', use 'drop' or 'block'")
+        self.sink = sink
+        self.overflow = overflow
+        import queue
+
+        self.dropped = 0
+        self._full = queue.Full
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._start()
+        _queued_sinks.add(self)
+        atexit.register(self.close)
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="ghostink-sink", daemon=True
+        )
+        self._thread.start()
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Start a new queue thread in a forked child, which has no copy of the
+        parent's. Etches the parent had queued are left to the parent.
+        """
+        if not self._closed:
+            self.queue = type(self.queue)(maxsize=self.queue.maxsize)
+            self._start()
+            close_in_child_at_exit(self)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                self.sink.close()
+                return
+            if isinstance(item, threading.Event):
+                self.sink.flush()
+                item.set()
+            else:
+                self.sink.write(item)
+
+    def write(self, etch: Etch) -> None:
+        if self.overflow == "block":
+            self.queue.put(etch)
+            return
+        try:
+            self.queue.put_nowait(etch)
+        except self._full:
+            self.dropped += 1
+
+    def replay(self, shades):
+        self.flush()
+        return self.sink.replay(shades)
+
+    def flush(self) -> None:
+        if self._thread.is_alive():
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait()
+
+    def close(self) -> None:
+        self._closed = True
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+        atexit.unregister(self.close)
@@ -0,0 +1,140 @@
+import functools
+import math
+from time import perf_counter_ns
+
+from . import callsite
+
+# Histogram buckets keep the top SUB_BITS + 1 bits of a duration: exact below
+# 2**(SUB_BITS + 1) ns, within 1 / 2**SUB_BITS (~6%) of the true value above.
+SUB_BITS = 4
+_SUB_COUNT = 1 << SUB_BITS
+_EXACT = _SUB_COUNT << 1
+
+
+def _bucket(ns: int) -> int:
+    if ns < _EXACT:
+        return ns
+    shift = ns.bit_length() - SUB_BITS - 1
+    return ((shift + 1) << SUB_BITS) + ((ns >> shift) & (_SUB_COUNT - 1))
+
+
+def _bucket_bounds(index: int) -> tuple:
+    if index < _EXACT:
+        return index, index
+    shift = (index >> SUB_BITS) - 1
+    top = _SUB_COUNT + (index & (_SUB_COUNT - 1))
+    return top << shift, ((top + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Streaming duration statistics in nanoseconds: count, total, min, max and
+    percentiles from a sparse log-linear histogram. Memory grows with the
+    spread of the durations (a few dozen buckets per decade), never with
+    the number of samples.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self._buckets = {}
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, ns: int) -> None:
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if self.max is None or ns > self.max:
+            self.max = ns
+        index = _bucket(ns)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """
+        Return the `q`th percentile (0-100) in nanoseconds, the middle of
+        the bucket holding it, clamped to the observed min and max.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count / 100))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min(max((low + high) / 2, self.min), self.max)
+        return float(self.max)
+
+
+class Span:
+    """
+    Times a block or a function and records the duration against its call
+    site in the GhostInk's span table, see `GhostInk.span`.
+
+    As a context manager the site is the `with` line; as a decorator it is
+    the decorated function, whichever line calls it.
+    """
+
+    def __init__(self, ghost_ink, name: str = None):
+        self.ghost_ink = ghost_ink
+        self.name = name
+        self._open = []  # (site key, start) per nested or reentrant use
+
+    def __enter__(self):
+        frame = callsite.caller_frame(self.ghost_ink.stack_offset)
+        key = (frame.f_code, frame.f_lineno)
+        self._open.append((key, perf_counter_ns()))
+        return self
+
+    def __exit__(self, *exc_info):
+        end = perf_counter_ns()
+        key, start = self._open.pop()
+        self.ghost_ink._record_span(key, self.name, end - start)
+
+    def __call__(self, func):
+        code = func.__code__
+        key = (code, code.co_firstlineno)
+        name = self.name or func.__qualname__
+        record = self.ghost_ink._record_span
+        import inspect
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def timed(*args, **kwargs):
+                start = perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(key, name, perf_counter_ns() - start)
+
+        else:
+
+            @functools.wraps(func)
+            def timed(*args, **kwargs):
+                start = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record(key, name, perf_counter_ns() - start)
+
+        return timed
+
+
+def format_ns(ns: float) -> str:
+    """Format a duration in nanoseconds with a readable unit."""
+    if ns < 1e3:
+        return f"{ns:.0f}ns"
+    if ns < 1e6:
+        return f"{ns / 1e3:.1f}us"
+    if ns < 1e9:
+        return f"{ns / 1e6:.2f}ms"
+    return f"{ns / 1e9:.3f}s"
@@ -0,0 +1,159 @@
+import os
+from collections import Counter
+from time import perf_counter_ns
+
+from .spans import LatencyHistogram
+
+
+class SampledTimer:
+    """
+    Counts every call of an instrumented step and times one call in `every`
+    (1 times them all, 0 none), so leaving it on costs a counter increment
+    per call and two clock reads per `every` calls. The total time is
+    estimated from the sampled mean. Counts are not locked: concurrent
+    threads may lose a few increments.
+    """
+
+    __slots__ = ("every", "calls", "sampled")
+
+    def __init__(self, every: int):
+        self.every = every
+        self.calls = 0
+        self.sampled = LatencyHistogram()
+
+    def start(self):
+        """Count a call; return its start time if it is timed, else None."""
+        self.calls += 1
+        if self.every and not self.calls % self.every:
+            return perf_counter_ns()
+        return None
+
+    def stop(self, start: int) -> None:
+        self.sampled.add(perf_counter_ns() - start)
+
+    def to_dict(self) -> dict:
+        sampled = self.sampled
+        return {
+            "calls": self.calls,
+            "sampled": sampled.count,
+            "mean_ns": sampled.mean,
+            "p99_ns": sampled.percentile(99),
+            "max_ns": sampled.max or 0,
+            "total_ns": sampled.mean * self.calls,  # estimated
+        }
+
+
+class OverheadStats:
+    """
+    What a GhostInk costs its host: drops and dedup hits per shade, and
+    sampled timers for each step of a drop and of a report. See `GhostInk.stats`.
+    """
+
+    TIMERS = ("frame_capture", "stack_trace", "object_format", "render", "log")
+
+    def __init__(self, every: int = 64):
+        """
+        Parameters:
+        - every (int): Time one call in `every` of each step; reports are rare
+          and always timed unless `every` is 0 (default: 64).
+        """
+        # keyed by shade ordinal, ints hash faster than Enum members
+        self.new = Counter()  # drops that added an etch
+        self.hits = Counter()  # drops merged into an equal etch
+        self.frame_capture = SampledTimer(every)
+        self.stack_trace = SampledTimer(every)
+        self.object_format = SampledTimer(every)
+        self.render = SampledTimer(min(every, 1))
+        self.log = SampledTimer(every)
+
+    def timers(self) -> dict:
+        return {name: getattr(self, name).to_dict() for name in self.TIMERS}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def prometheus_text(stats: dict, instance: str = "GhostInk") -> str:
+    """
+    Render `GhostInk.stats()` in the Prometheus text exposition format.
+
+    Parameters:
+    - stats (dict): The output of `GhostInk.stats()`.
+    - instance (str): Value of the `instance` label on every sample (default: "GhostInk").
+
+    Returns:
+    - str: The metrics, one `# HELP`/`# TYPE` block per metric.
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{{{_labels(instance=instance, **labels)}}} {value}")
+
+    metric(
+        "ghostink_drops_total",
+        "counter",
+        "Drops recorded, new etches and repeats.",
+        [({"shade": shade}, count) for shade, count in stats["drops"].items()],
+    )
+    metric(
+        "ghostink_dedup_hits_total",
+        "counter",
+        "Drops merged into an equal etch.",
+        [({"shade": shade}, count) for shade, count in stats["dedup_hits"].items()],
+    )
+    metric(
+        "ghostink_sampled_out_total",
+        "counter",
+        "Drops suppressed by samplers.",
+        [({}, stats["sampled_out"])],
+    )
+    timers = stats["timers"].items()
+    metric(
+        "ghostink_step_calls_total",
+        "counter",
+        "Calls of each instrumented step.",
+        [({"step": step}, timer["calls"]) for step, timer in timers],
+    )
+    metric(
+        "ghostink_step_seconds_total",
+        "counter",
+        "Time spent in each step, estimated from sampled calls.",
+        [({"step": step}, timer["total_ns"] / 1e9) for step, timer in timers],
+    )
+    metric(
+        "ghostink_step_p99_seconds",
+        "gauge",
+        "99th percentile of the sampled calls of each step.",
+        [({"step": step}, timer["p99_ns"] / 1e9) for step, timer in timers],
+    )
+    store = stats["store"]
+    metric("ghostink_store_etches", "gauge", "Etches held.", [({}, store["etches"])])
+    metric(
+        "ghostink_store_bytes", "gauge", "Approximate bytes held by etches.", [({}, store["bytes"])]
+    )
+    metric(
+        "ghostink_store_evicted_total",
+        "counter",
+        "Etches evicted by retention limits.",
+        [({"shade": shade}, count) for shade, count in store["evicted"].items()],
+    )
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, stats: dict, instance: str = "GhostInk") -> None:
+    """
+    Atomically replace `path` with the metrics, for the node_exporter
+    textfile collector or any scraper reading files.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as out:
+        out.write(prometheus_text(stats, instance))
+    os.replace(temp_path, path)
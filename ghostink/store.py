@@ -0,0 +1,242 @@
+import time
+from collections import Counter, OrderedDict
+from collections.abc import MutableSet
+from itertools import chain
+
+
+def _shade_order(etch):
+    return etch.shade.value
+
+
+def _frequency_order(etch):
+    return -etch.count
+
+
+def _recent_order(etch):
+    return -etch.last_seen
+
+
+class EtchStore(MutableSet):
+    """
+    Insertion-ordered set of Etch records with secondary indexes by shade,
+    file and echo, so filtered lookups cost in proportion to the matches.
+
+    Compares equal to a plain set holding the same etches.
+
+    Retention limits are optional. When one is exceeded, the oldest etches are
+    evicted (the oldest of that shade for a per-shade quota), and `evicted`
+    counts the evictions per shade. Global order and shade buckets are
+    OrderedDicts, so every eviction is O(1).
+
+    Every new etch gets the next sequence number in `seq`; `seq` is the
+    cursor for `since`, which lists the etches added after it.
+    """
+
+    def __init__(
+        self,
+        etches=(),
+        max_etches: int = None,
+        max_bytes: int = None,
+        shade_quotas: dict = None,
+        ttl: float = None,
+    ):
+        """
+        Parameters:
+        - etches (iterable of Etch): Initial etches (default: ()).
+        - max_etches (int): Maximum number of etches kept (default: None, unbounded).
+        - max_bytes (int): Maximum approximate bytes held by etches (default: None, unbounded).
+        - shade_quotas (dict): Maximum etches kept per shade, e.g. {shade.DEBUG: 500};
+          shades missing from the dict are only bound by the global limits (default: None).
+        - ttl (float): Seconds an etch is kept after it was first dropped (default: None).
+        """
+        self.max_etches = max_etches
+        self.max_bytes = max_bytes
+        self.shade_quotas = dict(shade_quotas or {})
+        self.ttl = ttl
+        self.evicted = Counter()
+        self.seq = 0  # sequence number of the last etch added, never reset
+        self.nbytes = 0
+        self._sizes = {}
+        self._etches = OrderedDict()
+        self._by_shade = {}
+        self._by_file = {}
+        self._by_echo = {}
+        for etch in etches:
+            self.add(etch)
+
+    def __contains__(self, etch):
+        return etch in self._etches
+
+    def __iter__(self):
+        return iter(self._etches)
+
+    def __len__(self):
+        return len(self._etches)
+
+    def __repr__(self):
+        return f"EtchStore({list(self._etches)!r})"
+
+    def add(self, etch) -> bool:
+        """
+        Add `etch`, or merge its occurrence counts into the equal etch
+        already stored.
+
+        Returns:
+        - bool: True if the etch was new.
+        """
+        stored = self._etches.get(etch)
+        if stored is not None:
+            stored.merge(etch)
+            return False
+        if self.ttl is not None:
+            self.expire()
+        self.seq += 1
+        etch.seq = self.seq
+        self._etches[etch] = etch
+        self._by_shade.setdefault(etch.shade, OrderedDict())[etch] = None
+        self._by_file.setdefault(etch.path, {})[etch] = None
+        for echo in etch.echoes:
+            self._by_echo.setdefault(echo, {})[etch] = None
+        size = self._sizes[etch] = etch.sizeof()
+        self.nbytes += size
+        self._enforce_limits(etch.shade)
+        return True
+
+    def _enforce_limits(self, shade) -> None:
+        quota = self.shade_quotas.get(shade)
+        if quota is not None:
+            bucket = self._by_shade[shade]
+            while len(bucket) > quota:
+                self._evict(next(iter(bucket)))
+        if self.max_etches is not None:
+            while len(self._etches) > self.max_etches:
+                self._evict(next(iter(self._etches)))
+        if self.max_bytes is not None:
+            while self._etches and self.nbytes > self.max_bytes:
+                self._evict(next(iter(self._etches)))
+
+    def _evict(self, etch) -> None:
+        self.discard(etch)
+        self.evicted[etch.shade] += 1
+
+    def expire(self, now: float = None) -> None:
+        """
+        Evict etches older than `ttl`. Etches are stored in drop order, so
+        this stops at the first one that is still fresh.
+        """
+        if self.ttl is None:
+            return
+        deadline = (time.monotonic() if now is None else now) - self.ttl
+        while self._etches:
+            oldest = next(iter(self._etches))
+            if oldest.created > deadline:
+                break
+            self._evict(oldest)
+
+    def since(self, cursor: int) -> list:
+        """
+        Return the etches added after `cursor`, oldest first. Etches are stored
+        in sequence order, so this walks back from the newest and costs in
+        proportion to the new etches, not the store.
+        """
+        new = []
+        for etch in reversed(self._etches):
+            if etch.seq <= cursor:
+                break
+            new.append(etch)
+        new.reverse()
+        return new
+
+    def discard(self, etch) -> None:
+        etch = self._etches.pop(etch, None)
+        if etch is None:
+            return
+        self.nbytes -= self._sizes.pop(etch)
+        self._unindex(self._by_shade, etch.shade, etch)
+        self._unindex(self._by_file, etch.path, etch)
+        for echo in etch.echoes:
+            self._unindex(self._by_echo, echo, etch)
+
+    def clear(self) -> None:
+        self.nbytes = 0
+        self._sizes.clear()
+        self._etches.clear()
+        self._by_shade.clear()
+        self._by_file.clear()
+        self._by_echo.clear()
+
+    @staticmethod
+    def _unindex(index, key, etch):
+        bucket = index[key]
+        del bucket[etch]
+        if not bucket:
+            del index[key]
+
+    def filter(
+        self, shade=None, file=None, echoes=None, sort: str = "shade", since: int = None
+    ) -> list:
+        """
+        Return the etches matching every given mask, sorted by shade and
+        then by insertion order, or by `sort`.
+
+        Parameters:
+        - shade (GhostInk.shade): Keep only this shade (default: None).
+        - file (str): Keep only etches from this relative path (default: None).
+        - echoes (tuple of str): Keep etches carrying any of these formatted echoes (default: None).
+        - sort (str): "shade", "frequency" (most hits first) or "recent" (latest hit first)
+          (default: "shade").
+        - since (int): Only etches added after this cursor, see `seq` (default: None).
+
+        Returns:
+        - list: The matching etches.
+        """
+        self.expire()
+        if since is not None:
+            # the new etches are few, test the masks on each of them
+            matches = [
+                etch
+                for etch in self.since(since)
+                if (shade is None or etch.shade == shade)
+                and (file is None or etch.path == file)
+                and (echoes is None or any(echo in echoes for echo in etch.echoes))
+            ]
+            matches.sort(key=_shade_order)
+            return self._sorted(matches, sort)
+
+        candidates = []
+        if shade is not None:
+            candidates.append(self._by_shade.get(shade, {}))
+        if file is not None:
+            candidates.append(self._by_file.get(file, {}))
+        if echoes is not None:
+            buckets = [self._by_echo[echo] for echo in echoes if echo in self._by_echo]
+            candidates.append(dict.fromkeys(chain.from_iterable(buckets)))
+
+        if not candidates:
+            # every bucket is already in insertion order, so walk them by shade
+            matches = [
+                etch
+                for bucket_shade in sorted(self._by_shade, key=lambda s: s.value)
+                for etch in self._by_shade[bucket_shade]
+            ]
+        else:
+            candidates.sort(key=len)
+            smallest, others = candidates[0], candidates[1:]
+            matches = [
+                etch for etch in smallest if all(etch in other for other in others)
+            ]
+            matches.sort(key=_shade_order)
+        return self._sorted(matches, sort)
+
+    @staticmethod
+    def _sorted(matches: list, sort: str) -> list:
+        # matches come in shade order, the sorts below are stable
+        if sort == "frequency":
+            matches.sort(key=_frequency_order)
+        elif sort == "recent":
+            matches.sort(key=_recent_order)
+        elif sort != "shade":
+            raise ValueError(
+                f"unvalid sort '{sort}', use 'shade', 'frequency' or 'recent'"
+            )
+        return matches
@@ -1,5 +1,6 @@
 import pytest
 import os
+import sys
 import json
 import logging
 from ghostink import GhostInk
@@ -55,6 +56,35 @@ def test_inkdrop_error_stacktrace(ghostink_instance):
     assert any("Stack Trace" in etch[1] for etch in ghostink_instance.etches)
 
 
+def test_inkdrop_lazy_stacktrace(capsys):
+    ink = GhostInk(lazy_traces=True)
+    ink.inkdrop("Lazy error", shade=GhostInk.shade.ERROR)
+    (etch,) = ink.etches
+    assert "Stack Trace" not in etch.text
+    assert etch.trace.frames[-1][0].co_name == "test_inkdrop_lazy_stacktrace"
+
+    ink.whisper()
+    captured = capsys.readouterr()
+    assert "Stack Trace" in captured.out
+    assert "test_inkdrop_lazy_stacktrace" in captured.out
+
+
+def test_etch_identity_ignores_stack_trace():
+    ink = GhostInk()
+
+    def drop_error():
+        ink.drop("Same error", shade=GhostInk.shade.ERROR)
+
+    drop_error()
+    drop_error()
+    (etch,) = ink.etches
+    shade, text, path, line, func, echoes = etch
+    assert shade == GhostInk.shade.ERROR
+    assert text.startswith("Same error\nStack Trace:")
+    assert "Stack Trace" not in etch.text
+    assert (path, line, func) == (etch.path, etch.line, "drop_error")
+
+
 def test_whisper(capsys, ghostink_instance):
     ghostink_instance.inkdrop("Debug message", shade=GhostInk.shade.DEBUG)
     ghostink_instance.inkdrop("Info message", shade=GhostInk.shade.INFO)
@@ -64,6 +94,832 @@ def test_whisper(capsys, ghostink_instance):
     assert "Info message" not in captured.out
 
 
+def test_whisper_echo_and_file_masks(capsys):
+    ink = GhostInk()
+    ink.drop("Query slow", shade=GhostInk.shade.WARN, echoes=["database"])
+    ink.drop("Cache miss", shade=GhostInk.shade.INFO, echoes=["cache", "database"])
+    ink.drop("Plain note")
+
+    matches = ink.etches.filter(echoes=("#database",))
+    assert [etch.text for etch in matches] == ["Cache miss", "Query slow"]
+    assert ink.etches.filter(shade=GhostInk.shade.TODO, echoes=("#database",)) == []
+
+    ink.whisper(echo_mask=["cache"], file_mask=matches[0].path)
+    captured = capsys.readouterr()
+    assert "Cache miss" in captured.out
+    assert "Query slow" not in captured.out
+    assert "Plain note" not in captured.out
+
+
+def test_etch_store_discard_updates_indexes(ghostink_instance):
+    ghostink_instance.drop("Gone soon", echoes=["tmp"])
+    (etch,) = ghostink_instance.etches
+    ghostink_instance.etches.discard(etch)
+    assert ghostink_instance.etches == set()
+    assert ghostink_instance.etches.filter(echoes=("#tmp",)) == []
+
+
+def test_retention_shade_quota_and_max_etches():
+    shade = GhostInk.shade
+    ink = GhostInk(max_etches=6, shade_quotas={shade.DEBUG: 2})
+    for i in range(5):
+        ink.drop(f"debug {i}", shade=shade.DEBUG)
+    ink.drop("keep me", shade=shade.ERROR)
+    assert sorted(etch.text for etch in ink.etches) == ["debug 3", "debug 4", "keep me"]
+    assert ink.etches.evicted[shade.DEBUG] == 3
+
+    for i in range(5):
+        ink.drop(f"todo {i}")
+    assert len(ink.etches) == 6
+    assert ink.etches.evicted[shade.DEBUG] == 5
+    assert ink.etches.filter(shade=shade.ERROR)[0].text == "keep me"
+    assert ink.etches.nbytes == sum(etch.sizeof() for etch in ink.etches)
+
+
+def test_retention_ttl_and_max_bytes():
+    ink = GhostInk(ttl=60)
+    ink.drop("old")
+    (old,) = ink.etches
+    ink.etches.expire(now=old.created + 61)
+    assert len(ink.etches) == 0
+    assert ink.etches.evicted[GhostInk.shade.TODO] == 1
+
+    ink = GhostInk(max_bytes=1)
+    ink.drop("too big")
+    assert len(ink.etches) == 0
+    assert ink.etches.nbytes == 0
+
+
+def test_async_log_writer(tmp_path):
+    ink = GhostInk(project_root=str(tmp_path), log_to_file=True, log_async=True)
+    ink.drop("Logged in the background")
+    ink.whisper()
+    assert ink.flush_logs(timeout=5)
+    with open(tmp_path / "logs" / "ghostink.log") as log:
+        assert "Logged in the background" in log.read()
+
+
+def test_async_log_writer_flushes_a_steady_trickle(tmp_path):
+    import time
+    from ghostink.logsink import AsyncFileWriter
+
+    path = tmp_path / "trickle.log"
+    writer = AsyncFileWriter(str(path), logging.Formatter("%(message)s"), flush_interval=0.1)
+    handler = writer.handler()
+    # records arrive faster than flush_interval, the batch is still written on time
+    for i in range(8):
+        handler.handle(logging.LogRecord("x", logging.DEBUG, __file__, 1, f"line {i}", None, None))
+        time.sleep(0.05)
+    assert path.read_text().count("line") >= 4
+    writer.close()
+    assert path.read_text().count("line") == 8
+
+
+def test_bounded_queue_handler_drops_when_full():
+    import queue
+    from ghostink.logsink import BoundedQueueHandler
+
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), overflow="drop")
+    record = logging.LogRecord("x", logging.DEBUG, __file__, 1, "msg", None, None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
+
+
+def test_jsonl_sink_streams_and_replays(tmp_path, capsys):
+    from ghostink import JsonlSink
+
+    sink = JsonlSink(str(tmp_path / "etches.jsonl"))
+    ink = GhostInk(sink=sink, max_etches=1)
+    for _ in range(2):
+        ink.drop("First", echoes=["stream"])  # the duplicate is not written again
+    ink.drop("Second", shade=GhostInk.shade.ERROR)
+    assert len(ink.etches) == 1
+
+    replayed = list(sink.replay(GhostInk.shade))
+    assert [etch.text for etch in replayed] == ["First", "Second"]
+    assert replayed[1].trace is not None
+
+    ink.whisper(echo_mask=["stream"], replay=True)
+    captured = capsys.readouterr()
+    assert "First" in captured.out
+    assert "Second" not in captured.out
+    sink.close()
+
+    with pytest.raises(ValueError, match="sink"):
+        GhostInk().whisper(replay=True)
+
+
+def test_queued_stream_sink():
+    import io
+    from ghostink import QueuedSink, StreamSink
+
+    stream = io.StringIO()
+    sink = QueuedSink(StreamSink(stream))
+    ink = GhostInk()
+    ink.drop("Per call sink", shade=GhostInk.shade.INFO, sink=sink)
+    sink.flush()
+    assert stream.getvalue().startswith("[INFO] - Per call sink - ")
+    sink.close()
+
+
+@pytest.mark.parametrize("format", ["jsonl", "binary"])
+def test_export_and_load(tmp_path, format):
+    ink = GhostInk()
+    ink.drop("Export me", shade=GhostInk.shade.WARN, echoes=["db", "slow"])
+    ink.drop({"key": "value"}, shade=GhostInk.shade.INFO)
+    path = str(tmp_path / f"etches.{format}")
+    assert ink.export(path, format=format) == 2
+
+    merged = GhostInk()
+    assert merged.load(path) == 2
+    assert merged.load(path) == 0
+    assert merged.etches == ink.etches
+    (warn,) = merged.etches.filter(shade=GhostInk.shade.WARN)
+    assert warn.echoes == ("#db", "#slow")
+    assert len(warn.trace) > 0
+    with open(path, "rb") as dump:
+        assert b"\x1b[" not in dump.read()
+
+
+def test_whisper_writes_report_in_bulk():
+    import io
+
+    class CountingStream(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    ink = GhostInk()
+    for i in range(50):
+        ink.drop(f"etch {i}")
+    stream = CountingStream()
+    ink.whisper(stream=stream)
+    assert stream.writes == 1
+    assert "etch 49" in stream.getvalue()
+    assert "Printed" in stream.getvalue()
+
+
+def test_iter_whisper_chunks():
+    ink = GhostInk()
+    for i in range(50):
+        ink.drop(f"etch {i}")
+    chunks = list(ink.iter_whisper(chunk_size=256))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+    report = "".join(chunks)
+    assert report.count("etch ") == 50
+    assert "test_ghostink.py" in report.split("Printed")[1]
+
+
+def test_whisper_since_cursor_and_reporter():
+    import io
+
+    ink = GhostInk(color=False, max_etches=3)
+
+    def drop(text, shade=GhostInk.shade.TODO):
+        ink.drop(text, shade=shade)  # one call site for every etch
+
+    for i in range(5):
+        drop(f"old {i}")
+    cursor = ink.whisper(stream=io.StringIO())
+    assert cursor == 5
+    drop("old 4")  # already reported, only counted again
+    drop("new error", GhostInk.shade.ERROR)
+    drop("new todo")
+    stream = io.StringIO()
+    assert ink.whisper(stream=stream, since=cursor) == 7
+    report = stream.getvalue()
+    assert "old" not in report
+    assert report.index("new error") < report.index("new todo")  # sorted as whisper
+
+    stream = io.StringIO()
+    ink.whisper_new(stream=stream)
+    assert "new todo" in stream.getvalue()  # the first call prints every etch
+    ink.drop("newer")
+    stream = io.StringIO()
+    assert ink.whisper_new(stream=stream) == 8
+    assert "newer" in stream.getvalue() and "new todo" not in stream.getvalue()
+
+    stream = io.StringIO()
+    ink.whisper_new(stream=stream)
+    assert stream.getvalue() == ""  # nothing new, nothing printed
+
+    stream = io.StringIO()
+    reporter = ink.start_reporter(interval=3600, stream=stream)
+    assert reporter.report()
+    assert not reporter.report()  # nothing new
+    ink.drop("at exit")
+    reporter.close()
+    assert stream.getvalue().count("newer") == 1
+    assert "at exit" in stream.getvalue()
+
+    # background reports are printed from the line that started the reporter
+    import time
+
+    stream = io.StringIO()
+    reporter = ink.start_reporter(interval=0.01, stream=stream)
+    started_at = sys._getframe().f_lineno - 1
+    ink.drop("in the background")
+    for _ in range(200):
+        if "in the background" in stream.getvalue():
+            break
+        time.sleep(0.01)
+    reporter.close()
+    assert f"Printed from: ghostink/tests/test_ghostink.py at line {started_at}" in stream.getvalue()
+    assert "threading.py" not in stream.getvalue()
+
+    # sampling summaries count only the drops suppressed since the cursor
+    from ghostink import EveryN
+
+    sampled = GhostInk(color=False, sampler=EveryN(2))
+
+    def hot(times):
+        for _ in range(times):
+            sampled.drop("hot")
+
+    hot(4)
+    cursor = sampled.whisper(stream=io.StringIO())
+    hot(2)
+    stream = io.StringIO()
+    sampled.whisper(stream=stream, since=cursor)
+    assert "Suppressed 1 of 2 drops" in stream.getvalue()
+
+    # other reports don't move whisper_new's sampling baseline
+    sampled.whisper_new(stream=io.StringIO())
+    hot(4)
+    sampled.whisper(stream=io.StringIO())
+    sampled.drop("new")
+    stream = io.StringIO()
+    sampled.whisper_new(stream=stream)
+    assert "Suppressed 2 of 4 drops" in stream.getvalue()
+
+
+def test_min_shade_and_shade_mask():
+    shade = GhostInk.shade
+    ink = GhostInk(min_shade=shade.WARN)
+    ink.drop("Hidden", shade=shade.DEBUG)
+    ink.drop("Hidden too")
+    ink.drop("Shown", shade=shade.ERROR)
+    assert [etch.text for etch in ink.etches] == ["Shown"]
+
+    ink.set_shade_filter(shades=[shade.DEBUG])
+    assert ink.is_enabled(shade.DEBUG)
+    assert not ink.is_enabled(shade.ERROR)
+
+    # shade names work like shades
+    named = GhostInk(min_shade="warn")
+    assert named.is_enabled(shade.WARN) and not named.is_enabled(shade.INFO)
+    named = GhostInk(shades=["ERROR"])
+    named.drop("Kept", shade=shade.ERROR)
+    assert [etch.text for etch in named.etches] == ["Kept"]
+    with pytest.raises(ValueError, match="shades 'EROR', use one of"):
+        GhostInk(shades=["EROR"])
+
+
+def test_shade_filter_from_env(monkeypatch):
+    monkeypatch.setenv("GHOSTINK_SHADES", "error, info")
+    ink = GhostInk()
+    enabled = [shade for shade in GhostInk.shade if ink.is_enabled(shade)]
+    assert enabled == [GhostInk.shade.INFO, GhostInk.shade.ERROR]
+
+    monkeypatch.setenv("GHOSTINK_MIN_SHADE", "verbose")
+    with pytest.raises(ValueError, match="GHOSTINK_MIN_SHADE 'verbose', use one of"):
+        GhostInk()
+
+
+def test_shade_handlers_are_singletons():
+    ink = GhostInk()
+    handler = ink.registry.handler(GhostInk.shade.INFO)
+    ink.drop("one", shade=GhostInk.shade.INFO)
+    ink.drop("two", shade=GhostInk.shade.INFO)
+    assert ink.registry.handler(GhostInk.shade.INFO) is handler
+    assert handler.ghost_ink is ink
+
+
+def test_register_custom_shade(capsys):
+    from colorama import Fore
+    from ghostink.shades.base import BaseEtch
+
+    class Perf(BaseEtch):
+        capture_trace = False
+
+        def format_input(self, etch_input):
+            return f"{etch_input:.1f} ms"
+
+    ink = GhostInk(color=True)
+    perf = ink.register_shade("PERF", Perf, color=Fore.GREEN)
+    assert ink.registry["PERF"] is perf
+    ink.drop(12.34, shade=perf)
+    (etch,) = ink.etches
+    assert etch.text == "12.3 ms"
+    assert etch.trace is None
+
+    ink.whisper()
+    captured = capsys.readouterr()
+    assert f"[{Fore.GREEN}PERF" in captured.out
+
+    ink.set_shade_filter(min_shade=GhostInk.shade.WARN)
+    assert not ink.is_enabled(perf)
+    with pytest.raises(ValueError):
+        ink.register_shade("PERF")
+
+    # shades of another instance are rejected, not silently dropped
+    other = GhostInk()
+    with pytest.raises(ValueError):
+        other.drop(1.0, shade=perf)
+    other.register_shade("PERF")
+    with pytest.raises(ValueError):
+        other.drop(1.0, shade=perf)
+
+
+def test_every_n_sampling_and_summary(capsys):
+    from ghostink import EveryN
+
+    ink = GhostInk(sampler=EveryN(10))
+    for i in range(25):
+        ink.drop(f"loop {i}")
+    assert sorted(etch.text for etch in ink.etches) == ["loop 0", "loop 10", "loop 20"]
+
+    ink.whisper()
+    captured = capsys.readouterr()
+    assert "Suppressed 22 of 25 drops at" in captured.out
+    assert "test_ghostink.py" in captured.out
+
+
+def test_per_call_sampler_and_token_bucket():
+    from ghostink import Probability, TokenBucket
+
+    ink = GhostInk()
+    for i in range(20):
+        ink.drop(f"never {i}", sample=Probability(0.0))
+    assert len(ink.etches) == 0
+
+    now = [0.0]
+    bucket = TokenBucket(rate=2, clock=lambda: now[0])
+    for second in range(2):
+        now[0] = second
+        for i in range(5):
+            ink.drop(f"burst {second}.{i}", sample=bucket)
+    assert len(ink.etches) == 4
+
+
+def test_occurrence_counting_and_frequency_sort(capsys):
+    ink = GhostInk()
+    for latency in (3.0, 1.0, 2.0):
+        ink.drop("request served", shade=GhostInk.shade.INFO, value=latency)
+    for _ in range(5):
+        ink.drop("cache hit", shade=GhostInk.shade.INFO)
+    ink.drop("rare", shade=GhostInk.shade.DEBUG)
+
+    served = ink.etches.filter(echoes=None, sort="frequency")
+    assert [etch.text for etch in served] == ["cache hit", "request served", "rare"]
+    request = served[1]
+    assert request.count == 3
+    assert request.first_seen <= request.last_seen
+    assert (request.values.min, request.values.avg, request.values.max) == (1.0, 2.0, 3.0)
+
+    ink.whisper(sort="frequency")
+    captured = capsys.readouterr()
+    assert captured.out.index("cache hit") < captured.out.index("rare")
+    assert "x5 from" in captured.out
+    assert "value min 1 / avg 2 / max 3" in captured.out
+
+
+@pytest.mark.parametrize("format", ["jsonl", "binary"])
+def test_export_keeps_occurrences(tmp_path, format):
+    ink = GhostInk()
+    for latency in (1.0, 5.0):
+        ink.drop("timed", value=latency)
+    path = str(tmp_path / "etches")
+    ink.export(path, format=format)
+
+    merged = GhostInk()
+    merged.load(path)
+    merged.load(path)
+    (etch,) = merged.etches
+    assert etch.count == 4
+    assert (etch.values.count, etch.values.max) == (4, 5.0)
+
+
+def test_threadsafe_drops_merge_on_read():
+    import threading
+
+    ink = GhostInk(threadsafe=True, buffer_size=64)
+
+    def worker(n):
+        for i in range(500):
+            ink.drop(f"thread {n} drop {i % 50}", shade=GhostInk.shade.INFO)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(ink.etches) == 8 * 50
+    assert sum(etch.count for etch in ink.etches) == 8 * 500
+    assert ink._buffers == []
+
+    # drops headed for a sink are written at once, not on the next merge
+    import io
+    from ghostink import StreamSink
+
+    stream = io.StringIO()
+    ink.drop("streamed", shade=GhostInk.shade.INFO, sink=StreamSink(stream))
+    assert "streamed" in stream.getvalue()
+
+
+def _drop_in_child(ink):
+    for _ in range(3):
+        ink.drop("from the child", shade=GhostInk.shade.WARN)
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="forked children need os.fork"
+)
+def test_collector_gathers_forked_children():
+    import multiprocessing
+
+    ink = GhostInk()
+    ink.drop("from the parent")
+    ink.start_collector()
+    ctx = multiprocessing.get_context("fork")
+    children = [ctx.Process(target=_drop_in_child, args=(ink,)) for _ in range(2)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+
+    texts = sorted(etch.text for etch in ink.etches)
+    assert texts == ["from the child", "from the parent"]
+    (child_etch,) = ink.etches.filter(shade=GhostInk.shade.WARN)
+    assert child_etch.count == 6
+
+
+def _log_in_child(ink):
+    ink.drop("from the child")
+    import io
+
+    ink.whisper(stream=io.StringIO())  # logged through the async writer
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="forked children need os.fork"
+)
+def test_forked_children_restart_writer_threads(tmp_path):
+    import multiprocessing
+    from ghostink import FileSink, QueuedSink
+
+    ink = GhostInk(
+        project_root=str(tmp_path),
+        log_to_file=True,
+        log_async=True,
+        sink=QueuedSink(FileSink(str(tmp_path / "sink.log"))),
+    )
+    child = multiprocessing.get_context("fork").Process(target=_log_in_child, args=(ink,))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    # written by the child's own threads, flushed when it exited
+    assert "from the child" in (tmp_path / "logs" / "ghostink.log").read_text()
+    assert "from the child" in (tmp_path / "sink.log").read_text()
+    assert ink.flush_logs(timeout=5)
+
+
+def test_connect_collector_pushes_and_clears():
+    parent = GhostInk()
+    worker = GhostInk(collector=parent.start_collector())
+    worker.drop("pushed etch")
+    assert worker.push() == 1
+    assert len(worker.etches) == 0
+    assert [etch.text for etch in parent.etches] == ["pushed etch"]
+
+
+def test_collector_client_keeps_etches_it_cannot_push():
+    import time
+
+    parent = GhostInk()
+    address, authkey = parent.start_collector()
+    worker = GhostInk()
+    worker.connect_collector(address, authkey, interval=0.02)
+    parent._collector.close()
+    worker.drop("undelivered")
+    with pytest.raises(OSError):
+        worker.push()
+    assert [etch.text for etch in worker.etches] == ["undelivered"]
+    time.sleep(0.1)  # failed background pushes keep the thread retrying
+    assert worker._collector_client._thread.is_alive()
+    assert len(worker.etches) == 1
+    worker._collector_client.close()
+
+
+def test_async_drops_are_tagged_per_task(capsys):
+    import asyncio
+    import io
+    from ghostink import StreamSink
+
+    out = io.StringIO()
+    ink = GhostInk(sink=StreamSink(out), task_echoes=True)
+
+    async def handle(request_id):
+        with ink.echo_scope(f"request-{request_id}"):
+            await asyncio.sleep(0)
+            await ink.adrop("Handling request", shade=GhostInk.shade.INFO)
+            ink.haunt()
+
+    async def main():
+        await asyncio.gather(
+            asyncio.create_task(handle(1), name="worker-1"),
+            asyncio.create_task(handle(2), name="worker-2"),
+        )
+        await ink.awhisper(echo_mask=["request-2"])
+
+    asyncio.run(main())
+    ink.drop("Outside any task")
+
+    first, second = ink.etches.filter(echoes=("#request-1", "#request-2"))
+    assert first.echoes == ("#request-1", "#task:worker-1")
+    assert second.echoes == ("#request-2", "#task:worker-2")
+    assert ink.etches.filter(sort="recent")[0].echoes == ()
+
+    captured = capsys.readouterr().out
+    assert "[task worker-1]" in captured
+    assert "#task:worker-2" in captured and "#task:worker-1" not in captured
+    ink._nonblocking(ink.sink).flush()
+    assert out.getvalue().count("Handling request") == 2
+    # the later sync drop went through the same queue
+    assert "Outside any task" in out.getvalue()
+
+    # a disabled shade starts no queue
+    quiet = GhostInk(sink=StreamSink(io.StringIO()), min_shade=GhostInk.shade.ERROR)
+    asyncio.run(quiet.adrop("off", shade=GhostInk.shade.DEBUG))
+    assert quiet._nonblocking_sinks == {}
+
+    # without task echoes, one line dropped from many tasks is one etch
+    shared = GhostInk()
+
+    async def miss():
+        shared.drop("cache miss")
+
+    async def many():
+        await asyncio.gather(*(miss() for _ in range(100)))
+
+    asyncio.run(many())
+    (etch,) = shared.etches
+    assert etch.count == 100
+
+
+def test_latency_histogram_percentiles():
+    from ghostink.spans import LatencyHistogram
+
+    histogram = LatencyHistogram()
+    for ns in range(1, 100001):
+        histogram.add(ns * 1000)
+    assert histogram.count == 100000
+    assert histogram.min == 1000 and histogram.max == 100000000
+    for q in (50, 95, 99):
+        exact = q * 1000000
+        assert abs(histogram.percentile(q) - exact) / exact < 0.07
+    assert len(histogram._buckets) < 300
+
+
+def test_stats_and_prometheus_file(tmp_path):
+    import io
+
+    ink = GhostInk(color=False, stats_sample=1, max_etches=3)
+    for i in range(3):
+        ink.drop("same")
+        ink.drop({"i": i}, shade=GhostInk.shade.ERROR)
+    ink.whisper(stream=io.StringIO())
+
+    stats = ink.stats()
+    assert stats["drops"] == {"ERROR": 3, "TODO": 3}
+    assert stats["dedup_hits"] == {"TODO": 2}
+    timers = stats["timers"]
+    assert timers["frame_capture"]["calls"] == timers["frame_capture"]["sampled"] == 6
+    assert timers["stack_trace"]["calls"] == 3
+    assert timers["object_format"]["calls"] == 3
+    assert timers["render"]["calls"] == 1 and timers["render"]["total_ns"] > 0
+    assert stats["store"]["etches"] == 3 and stats["store"]["bytes"] > 0
+    assert stats["store"]["evicted"] == {"TODO": 1}
+
+    path = tmp_path / "ghostink.prom"
+    ink.write_prometheus(str(path))
+    text = path.read_text()
+    assert '# TYPE ghostink_drops_total counter' in text
+    assert 'ghostink_drops_total{instance="GhostInk",shade="ERROR"} 3' in text
+    assert 'ghostink_step_calls_total{instance="GhostInk",step="frame_capture"} 6' in text
+
+
+def test_spans_time_blocks_and_functions():
+    import asyncio
+    import io
+
+    ink = GhostInk(color=False)
+
+    @ink.span
+    def work():
+        pass
+
+    @ink.span("fetch")
+    async def fetch():
+        await asyncio.sleep(0)
+
+    for _ in range(3):
+        work()
+        with ink.span():
+            work()
+    asyncio.run(fetch())
+
+    rows = {name or key[0].co_name: h.count for key, (name, h) in ink._spans.items()}
+    assert rows == {
+        "test_spans_time_blocks_and_functions.<locals>.work": 6,
+        "test_spans_time_blocks_and_functions": 3,
+        "fetch": 1,
+    }
+
+    report = io.StringIO()
+    ink.span_report(stream=report, sort="count")
+    lines = report.getvalue().splitlines()
+    assert "p99" in lines[3]
+    assert lines[4].split()[0] == "6" and "<locals>.work (" in lines[4]
+    with pytest.raises(ValueError):
+        ink.span_report(sort="median")
+    ink.reset_spans()
+    assert ink._spans == {}
+
+
+def test_scan_harvests_comment_markers(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    source = tmp_path / "app.py"
+    source.write_text(
+        "x = 1  # TODO(db, perf): index the table\n"
+        "\n"
+        "# FIXME handle timeouts\n"
+        "y = '# not a marker'\n"
+    )
+    (tmp_path / "README.md").write_text("# TODO: not a source file\n")
+    ink = GhostInk(project_root=str(tmp_path))
+    assert ink.scan() == 2
+
+    todo, warn = ink.etches.filter()
+    assert (todo.shade, todo.path, todo.line) == (GhostInk.shade.TODO, "app.py", 1)
+    assert todo.text == "index the table"
+    assert todo.echoes == ("#db", "#perf")
+    assert (warn.shade, warn.line) == (GhostInk.shade.WARN, 3)
+    assert warn.text == "FIXME: handle timeouts"
+
+    # unchanged files come from the cache, removed comments drop their etch
+    rescan = GhostInk(project_root=str(tmp_path))
+    assert rescan.scan() == 2
+    source.write_text("# FIXME handle timeouts\n")
+    assert ink.scan() == 1  # the FIXME moved to line 1
+    assert [(etch.text, etch.line) for etch in ink.etches] == [("FIXME: handle timeouts", 1)]
+
+    # the same file named another way is the same entry
+    monkeypatch.chdir(tmp_path)
+    ink.inkdrop(filename="app.py")
+    ink.inkdrop(filename="./app.py")
+    assert [etch.count for etch in ink.etches] == [1]
+    assert list(ink._scanned) == [str(source)]
+    # the cache lives in the user cache directory, not in the project
+    assert list((tmp_path / "cache" / "ghostink").glob("scan-*.json"))
+    assert not (tmp_path / "logs").exists()
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_scanner_pool_and_cache(tmp_path):
+    from ghostink.scanner import SourceScanner
+
+    for i in range(80):
+        (tmp_path / f"mod_{i}.py").write_text(f"# NOTE: module {i}\n")
+    scanner = SourceScanner(str(tmp_path), cache_path=str(tmp_path / "scan.json"), workers=2)
+    results = scanner.scan()
+    assert scanner.read == 80
+    assert results[str(tmp_path / "mod_7.py")] == [[1, "NOTE", [], "module 7"]]
+
+    os.utime(tmp_path / "mod_3.py")  # touched but unchanged
+    (tmp_path / "mod_5.py").write_text("# BUG: broken\n")
+    results = scanner.scan()
+    assert scanner.read == 2
+    assert results[str(tmp_path / "mod_5.py")] == [[1, "BUG", [], "broken"]]
+
+
+_IMPORT_PROBE = """
+import json, sys, time
+preloaded = set(sys.modules)
+stdout = sys.stdout
+start = time.perf_counter()
+import ghostink
+ghostink.ghostall()
+GhostInk()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "elapsed": elapsed,
+    "loaded": sorted(set(sys.modules) - preloaded),
+    "stdout_wrapped": sys.stdout is not stdout,
+}))
+"""
+
+# imported only by the features that need them
+_LAZY_MODULES = (
+    "asyncio", "logging", "inspect", "traceback", "random", "datetime",
+    "concurrent.futures", "multiprocessing", "socket", "queue", "hashlib", "mmap",
+)
+
+
+def test_import_budget():
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    probe = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE],
+        capture_output=True,
+        text=True,
+        cwd=root,
+        check=True,
+    )
+    result = json.loads(probe.stdout)
+    assert [name for name in _LAZY_MODULES if name in result["loaded"]] == []
+    assert not result["stdout_wrapped"]
+    # generous, the module list above is the precise check
+    assert result["elapsed"] < 0.5
+
+
+_HOOKED_MODULE = """
+from ghostink import GhostInk
+
+ink = GhostInk(color=False)
+calls = []
+
+
+def note(label):
+    calls.append(label)
+    return label
+
+
+def work():
+    ink.drop(note("debug"), shade=GhostInk.shade.DEBUG)
+    ink.drop(note("todo"))
+    ink.haunt(note("haunt"))
+    ink.drop(note("error"), GhostInk.shade.ERROR)
+    raise RuntimeError("line 18")
+"""
+
+
+def test_import_hook_strips_disabled_drops(tmp_path, monkeypatch):
+    import sys
+    import traceback
+    from ghostink import importhook
+
+    package = tmp_path / "hooked_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "mod.py").write_text(_HOOKED_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+
+    def load(finder):
+        for name in ("hooked_pkg.mod", "hooked_pkg"):
+            sys.modules.pop(name, None)
+        try:
+            import hooked_pkg.mod
+        finally:
+            importhook.uninstall(finder)
+        return hooked_pkg.mod
+
+    finder = importhook.install(["hooked_pkg"], min_shade="WARN")
+    mod = load(finder)
+    with pytest.raises(RuntimeError) as raised:
+        mod.work()
+    # arguments of stripped drops are never evaluated
+    assert mod.calls == ["error"]
+    assert [etch.text for etch in mod.ink.etches] == ["error"]
+    # line numbers are untouched
+    assert traceback.extract_tb(raised.tb)[-1].lineno == 18
+    assert finder.compiled == 2
+
+    # the rewritten bytecode is cached under its own tag and reused
+    cached = list((package / "__pycache__").glob(f"mod.*.opt-{finder.tag}.pyc"))
+    assert len(cached) == 1
+    finder = importhook.install(["hooked_pkg"], min_shade="WARN")
+    load(finder)
+    assert finder.compiled == 0
+    for name in ("hooked_pkg.mod", "hooked_pkg"):
+        sys.modules.pop(name, None)
+
+    # a string is not a shade and inkdrop raises on it, so the call is kept
+    import ast
+
+    stripper = importhook.DropStripper(30, ("ink",))
+    stripper.visit(ast.parse('ink.drop("x", "DEBUG")\nink.drop("y", shade="INFO")'))
+    assert stripper.removed == 0
+
+
 def test_color_text(ghostink_instance):
     text = "Test"
     for shade in GhostInk.shade:
@@ -71,6 +927,30 @@ def test_color_text(ghostink_instance):
         assert text in colored_text  # Ensure the text is wrapped with color codes
 
 
+def test_theme_echo_colors_are_stable():
+    from ghostink.theme import Theme
+
+    first, second = Theme(), Theme()
+    assert first.echo("#database") == second.echo("#database")
+    assert first.echo("#database") is first.echo("#database")
+    assert Theme(color=False).echo("#database") == " #database "
+
+
+def test_whisper_color_modes():
+    import io
+
+    ink = GhostInk()
+    ink.drop("Plain etch", echoes=["tag"])
+    stream = io.StringIO()
+    ink.whisper(stream=stream)  # "auto" on a non-terminal stream
+    assert "\x1b[" not in stream.getvalue()
+
+    ink.color = True
+    stream = io.StringIO()
+    ink.whisper(stream=stream)
+    assert "\x1b[" in stream.getvalue()
+
+
 def test_get_relative_path(ghostink_instance):
     path, line, func = ghostink_instance._get_relative_path()
     assert isinstance(path, str)
@@ -78,6 +958,38 @@ def test_get_relative_path(ghostink_instance):
     assert isinstance(func, str)
 
 
+def test_inkdrop_reports_caller():
+    ink = GhostInk()
+    ink.inkdrop("Where am I")
+    (etch,) = ink.etches
+    assert etch[2].endswith("test_ghostink.py")
+    assert etch[4] == "test_inkdrop_reports_caller"
+
+
+def test_stack_offset_skips_wrappers():
+    ink = GhostInk(stack_offset=1)
+
+    def log_helper(msg):
+        ink.drop(msg)
+
+    log_helper("Wrapped etch")
+    (etch,) = ink.etches
+    assert etch[4] == "test_stack_offset_skips_wrappers"
+
+
+def test_call_site_cache_invalidated_on_project_root():
+    ink = GhostInk()
+    for _ in range(3):
+        ink.drop("Cached site")
+    assert len(ink._callsites) == 1
+    sites = [ink._get_call_site() for _ in range(2)]
+    assert sites[0] is sites[1]
+
+    ink.project_root = os.path.dirname(__file__)
+    assert len(ink._callsites) == 0
+    assert ink._get_call_site().path == "test_ghostink.py"
+
+
 def test_format_etch_from_object(ghostink_instance):
     # Test with dict
     dict_input = {"key": "value"}
@@ -99,6 +1011,44 @@ def test_format_etch_from_object(ghostink_instance):
     assert '"attr": "test"' in formatted
 
 
+def test_object_formatter_limits_and_deferral():
+    from ghostink import ObjectFormatter
+
+    formatter = ObjectFormatter(max_depth=2, max_items=3, max_chars=200)
+    payload = {"rows": list(range(1000)), "deep": {"a": {"b": 1}}, "obj": object()}
+    text = formatter.format(payload)
+    assert '"... 997 more items"' in text
+    assert '"<dict with 1 items>"' in text
+    assert '"<object object at' in text
+    assert formatter.format("x" * 500).endswith("... (300 more characters)")
+
+    ink = GhostInk(formatter=formatter)
+    for uid in (1, 1):
+        ink.drop({"user": uid}, shade=GhostInk.shade.INFO)
+        ink.drop(("a", 0), shade=GhostInk.shade.INFO)
+    assert sorted(etch.count for etch in ink.etches) == [2, 2]
+
+    deferred = GhostInk(formatter=formatter, defer_objects=True)
+    data = {"status": "pending"}
+    for _ in range(2):
+        deferred.drop(data, shade=GhostInk.shade.INFO)
+        deferred.drop(int("1000"), shade=GhostInk.shade.INFO)  # formatted at once
+    data["status"] = "done"
+    assert sorted(etch.count for etch in deferred.etches) == [2, 2]
+    assert '"status": "done"' in "".join(etch.text for etch in deferred.etches)
+    # max_bytes needs the formatted size, nothing is deferred
+    bounded = GhostInk(formatter=formatter, defer_objects=True, max_bytes=10000)
+    bounded.drop(list(range(100000)))
+    (etch,) = bounded.etches
+    assert etch._text.__class__ is str
+
+    class Template(str):
+        pass
+
+    ink.drop(Template("a {x}"))
+    assert "a {x}" in [etch.text for etch in ink.etches]
+
+
 def test_format_echoes(ghostink_instance):
     echoes = ["tag1", " tag2", "#tag3"]
     formatted = ghostink_instance._format_echoes(echoes)
@@ -0,0 +1,118 @@
+import sys
+import zlib
+from colorama import Fore, Back, Style
+
+# shade name -> foreground color
+SHADE_COLORS = {
+    "TODO": Fore.YELLOW,
+    "DEBUG": Fore.BLUE,
+    "INFO": Fore.MAGENTA,
+    "WARN": Fore.RED,
+    "ERROR": Fore.RED + Style.BRIGHT,
+}
+
+# echo backgrounds, picked by a stable hash of the echo tag
+ECHO_PALETTE = (
+    Back.BLACK,
+    Back.RED,
+    Back.GREEN,
+    Back.YELLOW,
+    Back.BLUE,
+    Back.MAGENTA,
+    Back.CYAN,
+    Back.WHITE,
+    Back.LIGHTBLACK_EX,
+    Back.LIGHTRED_EX,
+    Back.LIGHTGREEN_EX,
+    Back.LIGHTYELLOW_EX,
+    Back.LIGHTBLUE_EX,
+    Back.LIGHTMAGENTA_EX,
+    Back.LIGHTCYAN_EX,
+    Back.LIGHTWHITE_EX,
+)
+
+TRACE_COLOR = Style.BRIGHT + Fore.RED + Style.DIM
+
+
+class Theme:
+    """
+    Precomputed color prefixes for rendering etches.
+
+    Shade prefixes are built once, and echo colors are derived from a CRC of
+    the tag and cached, so the same echo keeps its color across whispers and
+    runs. With `color=False` every method returns plain text.
+    """
+
+    def __init__(self, color: bool = True, shade_colors: dict = None):
+        """
+        Parameters:
+        - color (bool): Emit ANSI color codes (default: True).
+        - shade_colors (dict): Shade name -> color prefix overrides (default: None).
+        """
+        self.color = color
+        self.reset = Style.RESET_ALL if color else ""
+        self._prefixes = dict(SHADE_COLORS)
+        self._prefixes.update(shade_colors or {})
+        if not color:
+            self._prefixes = dict.fromkeys(self._prefixes, "")
+        self._echoes = {}
+
+    def set_shade_color(self, name: str, color: str) -> None:
+        """Set the color prefix used for the shade called `name`."""
+        self._prefixes[name] = color if self.color else ""
+
+    def prefix(self, name: str) -> str:
+        """Return the color prefix of the shade called `name`."""
+        return self._prefixes.get(name, self.reset)
+
+    def paint(self, name: str, text: str) -> str:
+        """Wrap `text` in the color of the shade called `name`."""
+        if not self.color:
+            return text
+        return f"{self._prefixes.get(name, self.reset)}{text}{self.reset}"
+
+    def echo(self, tag: str) -> str:
+        """Return `tag` padded and painted with its stable background color."""
+        try:
+            return self._echoes[tag]
+        except KeyError:
+            if self.color:
+                back = ECHO_PALETTE[zlib.crc32(tag.encode("utf-8")) % len(ECHO_PALETTE)]
+                painted = f"{back}{Style.BRIGHT} {tag} {self.reset}"
+            else:
+                painted = f" {tag} "
+            self._echoes[tag] = painted
+            return painted
+
+    def trace(self, lines) -> str:
+        """Join stack trace lines, painting each one in the trace color."""
+        if not self.color:
+            return "".join(lines)
+        return "".join(f"{TRACE_COLOR}{line}{self.reset}" for line in lines)
+
+
+_console_ready = False
+
+
+def prepare_console() -> None:
+    """
+    Let the console render ANSI colors, once, on the first colored output.
+
+    Only Windows consoles need it. Unlike colorama's `init(autoreset=True)`,
+    run at import time before, sys.stdout is not wrapped for everyone.
+    """
+    global _console_ready
+    if _console_ready:
+        return
+    _console_ready = True
+    import colorama
+
+    fix = getattr(colorama, "just_fix_windows_console", None)  # colorama >= 0.4.6
+    if fix is not None:
+        fix()
+    elif sys.platform == "win32":
+        colorama.init()
+
+
+COLOR = Theme(color=True)
+PLAIN = Theme(color=False)
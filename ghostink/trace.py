@@ -0,0 +1,103 @@
+import sys
+from . import callsite
+from .theme import COLOR
+
+
+def colorize_trace(lines) -> str:
+    """
+    Join formatted stack trace lines, wrapping each one in the trace colors.
+    """
+    return COLOR.trace(lines)
+
+
+class StackTrace:
+    """
+    A stack trace formatted at capture time, colored only when displayed.
+    """
+
+    __slots__ = ("lines",)
+
+    def __init__(self, lines: tuple):
+        self.lines = lines
+
+    @classmethod
+    def capture(cls, depth: int = 0) -> "StackTrace":
+        """
+        Format the stack from the caller outside of GhostInk up to the top.
+
+        Parameters:
+        - depth (int): Extra frames to skip, see `callsite.caller_frame` (default: 0).
+        """
+        import traceback
+
+        return cls(tuple(traceback.format_stack(callsite.caller_frame(depth))))
+
+    def format(self) -> list:
+        return list(self.lines)
+
+    def sizeof(self) -> int:
+        return sys.getsizeof(self.lines) + sum(sys.getsizeof(line) for line in self.lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+
+class LazyTrace:
+    """
+    A stack trace captured as (code object, line number) pairs only.
+
+    Source lines are looked up and formatted when the trace is displayed,
+    not when it is captured.
+    """
+
+    __slots__ = ("frames", "_hash")
+
+    def __init__(self, frames: tuple):
+        self.frames = frames
+        self._hash = hash(frames)
+
+    @classmethod
+    def capture(cls, depth: int = 0) -> "LazyTrace":
+        """
+        Capture the stack from the caller outside of GhostInk up to the top.
+
+        Parameters:
+        - depth (int): Extra frames to skip, see `callsite.caller_frame` (default: 0).
+        """
+        frames = []
+        frame = callsite.caller_frame(depth)
+        while frame is not None:
+            frames.append((frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+        frames.reverse()
+        return cls(tuple(frames))
+
+    def format(self) -> list:
+        """
+        Return the trace lines in the same layout as `traceback.format_stack`.
+        """
+        import traceback
+
+        return traceback.StackSummary.from_list(
+            [
+                traceback.FrameSummary(
+                    code.co_filename, line_no, code.co_name, lookup_line=False
+                )
+                for code, line_no in self.frames
+            ]
+        ).format()
+
+    def sizeof(self) -> int:
+        # code objects are shared with the interpreter; count the pairs only
+        return sys.getsizeof(self.frames) + sum(sys.getsizeof(pair) for pair in self.frames)
+
+    def __eq__(self, other):
+        if not isinstance(other, LazyTrace):
+            return NotImplemented
+        return self.frames == other.frames
+
+    def __hash__(self):
+        return self._hash
+
+    def __len__(self):
+        return len(self.frames)
@@ -3,7 +3,7 @@ from setuptools import setup, find_packages
 setup(
     name="GhostInk",
     version="0.1.9",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     author="Yeeloman",
     author_email="yami.onlyme@gmail.com",
     description="A task management tool for developers.",